@@ -0,0 +1,309 @@
+import json
+import sqlite3
+from collections import OrderedDict
+from agent import Agent
+from emotion import Emotion
+from goal import Goal
+from relation import Relation
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS agents (name TEXT PRIMARY KEY, gain REAL NOT NULL, state TEXT NOT NULL, saved_millis INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS goals (name TEXT PRIMARY KEY, utility REAL NOT NULL, likelihood REAL, is_maintenance_goal INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS agent_goals (goal TEXT NOT NULL, agent TEXT NOT NULL, PRIMARY KEY (goal, agent)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS relations (target TEXT NOT NULL, agent TEXT NOT NULL, PRIMARY KEY (target, agent)) WITHOUT ROWID;
+'''
+
+'''
+Class AgentStore
+Disk-backed (SQLite) storage of agents, their goals and relations, for worlds larger than RAM.
+Only the hot agents are resident, i.e., registered to the Gamygdala instance: get() pages an agent in on demand,
+and the least recently used agents are paged out when there are more than capacity of them.
+Paged out agents that changed are written back in batches of batch_size. The goals nobody resident owns anymore leave the Gamygdala
+instance every batch_size paged out goals, whether their owners changed or not, and are written with the next batch.
+When an agent is paged in, the decay it missed while paged out is applied at once (decay function over the elapsed time).
+Notes:
+* Only resident agents take part in the appraisal, page in the goal owners (see load_goal_owners) and their observers (see load_observers)
+  before appraising.
+* Agents created directly with Gamygdala.create_agent are not managed by the store, use AgentStore.create_agent.
+* The goals whose owners are all paged out are not known to the Gamygdala instance, use AgentStore.create_goal_for_agent and
+  AgentStore.get_goal instead of the Gamygdala methods, so that a goal is paged in rather than created again.
+* The decay time is the Gamygdala clock (last_millis), so pages only decay for the time that decay_all has seen.
+Params:
+* gamygdala_instance: The Gamygdala instance.
+* path: The SQLite database file (':memory:' for a temporary database).
+* capacity: The maximum number of resident agents.
+* batch_size: The number of paged out agents written back in one transaction.
+'''
+class AgentStore:
+    def __init__(self, gamygdala_instance, path=':memory:', capacity=1000, batch_size=100):
+        self.gamygdala_instance = gamygdala_instance
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.resident = OrderedDict()   # name -> (agent, snapshot at page in, None for new agents)
+        self.pending_agents = {}        # name -> (gain, state, goal names, relation target names, saved_millis)
+        self.pending_goals = {}         # name -> (utility, likelihood, is_maintenance_goal)
+        self.paged_out_goals = set()
+        self.loads = 0
+        self.writes = 0
+
+    def __len__(self):
+        return len(self.resident)
+
+    def __contains__(self, agent_name):
+        return agent_name in self.resident or agent_name in self.pending_agents or self._select_agent(agent_name) is not None
+
+    '''
+    method create_agent
+    Creates a new agent, registered to Gamygdala and managed by the store.
+    Params:
+    * agent_name: The agent's name.
+    * archetype: The agent's archetype [optional], see Gamygdala.create_agent.
+    return {Agent}: The new agent (or the known one if an agent with this name exists).
+    '''
+    def create_agent(self, agent_name, archetype=None):
+        if agent_name in self:
+            print(f"Warning: agent {agent_name} already exists in the store")
+            return self.get(agent_name)
+        agent = Agent(agent_name, archetype)
+        self.gamygdala_instance.register_agent(agent)
+        self.resident[agent_name] = (agent, None)
+        self._page_out_over_capacity()
+        return agent
+
+    '''
+    method get
+    Returns an agent, paging it in if needed (which may page out the least recently used agents).
+    Params:
+    * agent_name: The agent's name.
+    return {Agent}: The agent, or None if the store does not know it.
+    '''
+    def get(self, agent_name):
+        entry = self.resident.get(agent_name)
+        if entry is not None:
+            self.resident.move_to_end(agent_name)
+            return entry[0]
+
+        row = self.pending_agents.pop(agent_name, None)
+        dirty = row is not None
+        if row is None:
+            row = self._select_agent(agent_name)
+            if row is None:
+                print(f'Warning: agent {agent_name} not found in the store')
+                return None
+
+        agent = self._page_in(agent_name, *row, dirty=dirty)
+        self._page_out_over_capacity()
+        return agent
+
+    '''
+    method get_goal
+    Returns a goal, paging it in if needed (the goals whose owners are all paged out are not registered to Gamygdala).
+    Params:
+    * goal_name: The goal's name.
+    return {Goal}: The goal, or None if neither Gamygdala nor the store knows it.
+    '''
+    def get_goal(self, goal_name):
+        goal = self.gamygdala_instance.get_goal_by_name(goal_name)
+        if goal is None:
+            goal = self._page_in_goal(goal_name)
+        return goal
+
+    '''
+    method create_goal_for_agent
+    Creates a goal for an agent managed by the store, like Gamygdala.create_goal_for_agent, but a goal known to the store is paged in
+    and shared instead of being created again.
+    Params:
+    * agent_name: The agent's name.
+    * goal_name: The goal's name.
+    * goal_utility: The goal's utility.
+    * is_maintenance_goal: Defines if the goal is a maintenance goal or not [optional].
+    return {Goal}: The goal, or None if the agent does not exist.
+    '''
+    def create_goal_for_agent(self, agent_name, goal_name, goal_utility, is_maintenance_goal=False):
+        agent = self.get(agent_name)
+        if agent is None:
+            return None
+        # paged in first, then Gamygdala shares it (with its warning about common goals)
+        self.get_goal(goal_name)
+        return self.gamygdala_instance.create_goal_for_agent(agent_name, goal_name, goal_utility, is_maintenance_goal)
+
+    '''
+    method load_goal_owners
+    Pages in all agents that own a goal, so that they can appraise a belief about it.
+    If there are more owners than the store capacity, only the last ones stay resident.
+    Params:
+    * goal_name: The goal's name.
+    return {list}: The owners.
+    '''
+    def load_goal_owners(self, goal_name):
+        names = {name for (name,) in self.connection.execute('SELECT agent FROM agent_goals WHERE goal = ?', (goal_name,))}
+        # rows that are not written yet are more recent than the database
+        for name, row in self.pending_agents.items():
+            if goal_name in row[2]:
+                names.add(name)
+            else:
+                names.discard(name)
+        for name, (agent, _) in self.resident.items():
+            if agent.has_goal(goal_name):
+                names.add(name)
+        return [self.get(name) for name in sorted(names)]
+
+    '''
+    method load_observers
+    Pages in all agents that have a relation with an agent (e.g. a goal owner), so that they feel its social emotions.
+    If there are more observers than the store capacity, only the last ones stay resident.
+    Params:
+    * agent_name: The agent's name.
+    return {list}: The observers.
+    '''
+    def load_observers(self, agent_name):
+        names = {name for (name,) in self.connection.execute('SELECT agent FROM relations WHERE target = ?', (agent_name,))}
+        # rows that are not written yet are more recent than the database
+        for name, row in self.pending_agents.items():
+            if agent_name in row[3]:
+                names.add(name)
+            else:
+                names.discard(name)
+        for name, (agent, _) in self.resident.items():
+            if agent.has_relation_with(agent_name):
+                names.add(name)
+        return [self.get(name) for name in sorted(names)]
+
+    '''
+    method flush
+    Writes all changed agents (resident or paged out) and their goals to the database.
+    '''
+    def flush(self):
+        for name, (agent, snapshot) in self.resident.items():
+            state = self._serialize(agent)
+            if state != snapshot:
+                self._queue(agent, state)
+                self.resident[name] = (agent, state)
+        self._write_batch()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    '''
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    Paging
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    '''
+    def _select_agent(self, agent_name):
+        row = self.connection.execute('SELECT gain, state, saved_millis FROM agents WHERE name = ?', (agent_name,)).fetchone()
+        if row is None:
+            return None
+        gain, state, saved_millis = row
+        data = json.loads(state)
+        return gain, state, data['goals'], [relation[0] for relation in data['relations']], saved_millis
+
+    def _page_in(self, agent_name, gain, state, goal_names, target_names, saved_millis, dirty=False):
+        em = self.gamygdala_instance
+        data = json.loads(state)
+        agent = Agent(agent_name, data.get('archetype'))
+        agent.gain = gain
+        agent.internal_state = [Emotion(name, intensity) for name, intensity in data['emotions']]
+        for goal_name in goal_names:
+            goal = em.get_goal_by_name(goal_name)
+            if goal is None:
+                goal = self._page_in_goal(goal_name)
+            if goal is not None:
+                agent.add_goal(goal)
+            else:
+                print(f'Warning: goal {goal_name} not found in the store')
+        for target_name, like, emotions in data['relations']:
+            relation = Relation(target_name, like)
+            relation.emotion_list = [Emotion(name, intensity) for name, intensity in emotions]
+            agent.current_relations.append(relation)
+
+        # decay for the time the agent was paged out
+        elapsed = em.last_millis - saved_millis
+        if elapsed > 0 and (agent.internal_state or agent.current_relations):
+            millis_passed = em.millis_passed
+            em.millis_passed = elapsed
+            agent.decay(em)
+            em.millis_passed = millis_passed
+
+        em.register_agent(agent)
+        # An agent that is only decayed stays clean: its row and saved_millis give the same state at the next page in.
+        # An agent paged in from the pending batch is dirty, as its row is not written yet.
+        self.resident[agent_name] = (agent, None if dirty else self._serialize(agent))
+        self.loads += 1
+        return agent
+
+    def _page_in_goal(self, goal_name):
+        row = self.pending_goals.get(goal_name)
+        if row is None:
+            row = self.connection.execute('SELECT utility, likelihood, is_maintenance_goal FROM goals WHERE name = ?', (goal_name,)).fetchone()
+            if row is None:
+                return None
+        utility, likelihood, is_maintenance_goal = row
+        goal = Goal(goal_name, utility, bool(is_maintenance_goal))
+        goal.likelihood = likelihood
+        self.gamygdala_instance.register_goal(goal)
+        self.paged_out_goals.discard(goal_name)
+        return goal
+
+    def _page_out_over_capacity(self):
+        while len(self.resident) > self.capacity:
+            name, (agent, snapshot) = self.resident.popitem(last=False)
+            state = self._serialize(agent)
+            if state != snapshot:
+                self._queue(agent, state)
+            self.gamygdala_instance.unregister_agent(agent)
+            self.paged_out_goals.update(goal.name for goal in agent.goals)
+            if len(self.paged_out_goals) >= self.batch_size:
+                self._release_goals()
+            if len(self.pending_agents) >= self.batch_size or len(self.pending_goals) >= self.batch_size:
+                self._write_batch()
+
+    def _serialize(self, agent):
+        # The goal states are part of the snapshot, so that an agent whose goals changed is written back with them
+        return json.dumps({
+            'archetype': agent.archetype,
+            'emotions': [(emotion.name, emotion.intensity) for emotion in agent.internal_state],
+            'goals': [goal.name for goal in agent.goals],
+            'relations': [(relation.agent_name, relation.like, [(emotion.name, emotion.intensity) for emotion in relation.emotion_list]) for relation in agent.current_relations],
+        }, separators=(',', ':')), tuple((goal.utility, goal.likelihood, goal.is_maintenance_goal) for goal in agent.goals)
+
+    def _queue(self, agent, state):
+        self.pending_agents[agent.name] = (agent.gain, state[0], [goal.name for goal in agent.goals],
+                                           [relation.agent_name for relation in agent.current_relations], self.gamygdala_instance.last_millis)
+        for goal in agent.goals:
+            self.pending_goals[goal.name] = (goal.utility, goal.likelihood, int(goal.is_maintenance_goal))
+
+    def _release_goals(self):
+        # goals owned by no resident agent anymore leave the Gamygdala instance, their state is written with the next batch
+        em = self.gamygdala_instance
+        owned = {goal.name for agent in em.agents for goal in agent.goals}
+        released = self.paged_out_goals - owned
+        if released:
+            for goal in em.goals:
+                if goal.name in released:
+                    self.pending_goals[goal.name] = (goal.utility, goal.likelihood, int(goal.is_maintenance_goal))
+            em.goals[:] = [goal for goal in em.goals if goal.name not in released]
+        self.paged_out_goals = set()
+
+    def _write_batch(self):
+        if self.paged_out_goals:
+            self._release_goals()
+
+        if not self.pending_agents and not self.pending_goals:
+            return
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO agents (name, gain, state, saved_millis) VALUES (?, ?, ?, ?)',
+                                        [(name, gain, state, saved_millis) for name, (gain, state, _, _, saved_millis) in self.pending_agents.items()])
+            self.connection.executemany('DELETE FROM agent_goals WHERE agent = ?', [(name,) for name in self.pending_agents])
+            self.connection.executemany('INSERT OR IGNORE INTO agent_goals (goal, agent) VALUES (?, ?)',
+                                        [(goal_name, name) for name, row in self.pending_agents.items() for goal_name in row[2]])
+            self.connection.executemany('DELETE FROM relations WHERE agent = ?', [(name,) for name in self.pending_agents])
+            self.connection.executemany('INSERT OR IGNORE INTO relations (target, agent) VALUES (?, ?)',
+                                        [(target_name, name) for name, row in self.pending_agents.items() for target_name in row[3]])
+            self.connection.executemany('INSERT OR REPLACE INTO goals (name, utility, likelihood, is_maintenance_goal) VALUES (?, ?, ?, ?)',
+                                        [(name,) + row for name, row in self.pending_goals.items()])
+        self.writes += len(self.pending_agents)
+        self.pending_agents = {}
+        self.pending_goals = {}
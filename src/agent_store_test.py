@@ -0,0 +1,170 @@
+import os
+import tempfile
+import unittest
+from gamygdala import Gamygdala
+from agent_store import AgentStore
+
+class TestAgentStore(unittest.TestCase):
+
+    def create_world(self, em, store, count):
+        for i in range(count):
+            agent = store.create_agent(f'npc{i}')
+            em.create_goal_for_agent(agent.name, f'goal{i}', 0.5, True)
+            agent.update_relation('npc0', 0.5)
+
+    def test_capacity(self):
+        em = Gamygdala()
+        store = AgentStore(em, capacity=10, batch_size=5)
+        self.create_world(em, store, 100)
+        self.assertEqual(len(store), 10)
+        self.assertEqual(len(em.agents), 10)
+        # the goals of paged out agents are released in batches
+        self.assertLessEqual(len(em.goals), 10 + store.batch_size)
+        self.assertGreaterEqual(store.writes, 85)
+
+    def test_clean_page_outs(self):
+        em = Gamygdala()
+        store = AgentStore(em, capacity=10, batch_size=5)
+        self.create_world(em, store, 200)
+        store.flush()
+
+        # a read-only pass pages every agent in and out without writing, the goals of paged out agents are still released
+        writes = store.writes
+        for i in range(200):
+            store.get(f'npc{i}')
+        self.assertEqual(store.writes, writes)
+        self.assertEqual(len(em.agents), 10)
+        self.assertLessEqual(len(em.goals), 10 + store.batch_size)
+        self.assertLess(len(store.pending_goals), store.batch_size)
+
+        # and found again
+        self.assertEqual(store.get('npc0').get_goal_by_name('goal0').utility, 0.5)
+
+    def test_round_trip(self):
+        em = Gamygdala()
+        store = AgentStore(em, capacity=2, batch_size=1)
+        self.create_world(em, store, 2)
+        npc1 = store.get('npc1')
+        npc1.set_gain(3)
+        em.appraise_belief(1.0, 'npc0', ['goal1'], [1.0])
+        self.assertEqual(em.get_goal_by_name('goal1').likelihood, 1.0)
+        emotions = {emotion.name: emotion.intensity for emotion in npc1.internal_state}
+        self.assertIn('gratitude', emotions)
+
+        # page npc1 out
+        store.create_agent('npc2')
+        store.create_agent('npc3')
+        self.assertIsNone(em.get_agent_by_name('npc1'))
+        self.assertIsNone(em.get_goal_by_name('goal1'))
+
+        npc1 = store.get('npc1')
+        self.assertEqual(npc1.gain, 3)
+        self.assertEqual({emotion.name: emotion.intensity for emotion in npc1.internal_state}, emotions)
+        self.assertEqual(npc1.get_goal_by_name('goal1').likelihood, 1.0)
+        self.assertTrue(npc1.get_goal_by_name('goal1').is_maintenance_goal)
+        self.assertEqual(npc1.get_relation('npc0').like, 0.5)
+        self.assertIn('gratitude', [emotion.name for emotion in npc1.get_relation('npc0').emotion_list])
+        self.assertIs(em.get_agent_by_name('npc1'), npc1)
+
+    def test_decay_while_paged_out(self):
+        em = Gamygdala()
+        em.set_decay(0.5, em.exponential_decay)
+        store = AgentStore(em, capacity=1, batch_size=1)
+        npc = store.create_agent('npc')
+        em.create_goal_for_agent(npc.name, 'goal', -1.0, True)
+        em.appraise_belief(0.6, None, ['goal'], [1.0])
+        intensity = npc.internal_state[0].intensity
+        store.create_agent('other')
+
+        # two seconds pass on the Gamygdala clock
+        em.last_millis += 2000
+        npc = store.get('npc')
+        self.assertAlmostEqual(npc.internal_state[0].intensity, intensity * 0.25)
+
+    def test_decay_profile_while_paged_out(self):
+        em = Gamygdala()
+        em.set_decay(0.5, em.exponential_decay)
+        em.set_decay_profile(0.9, em.exponential_decay, archetype='boss')
+        store = AgentStore(em, capacity=1, batch_size=1)
+        boss = store.create_agent('boss', 'boss')
+        em.create_goal_for_agent(boss.name, 'goal', -1.0, True)
+        em.appraise_belief(0.6, None, ['goal'], [1.0])
+        intensity = boss.internal_state[0].intensity
+        store.create_agent('other')
+
+        # the archetype is stored with the agent, the boss decays slower
+        em.last_millis += 2000
+        boss = store.get('boss')
+        self.assertEqual(boss.archetype, 'boss')
+        self.assertAlmostEqual(boss.internal_state[0].intensity, intensity * 0.81)
+
+    def test_load_goal_owners(self):
+        em = Gamygdala()
+        store = AgentStore(em, capacity=3, batch_size=2)
+        self.create_world(em, store, 10)
+        shared = em.get_goal_by_name('goal9')
+        for name in ('npc2', 'npc5'):
+            store.get(name).add_goal(shared)
+        for i in range(10, 14):
+            store.create_agent(f'npc{i}')
+        owners = store.load_goal_owners('goal9')
+        self.assertEqual(sorted(agent.name for agent in owners), ['npc2', 'npc5', 'npc9'])
+        self.assertTrue(all(em.get_agent_by_name(agent.name) is agent for agent in owners))
+
+    def test_shared_goal_paged_out(self):
+        em = Gamygdala()
+        store = AgentStore(em, capacity=2, batch_size=1)
+        store.create_agent('a')
+        store.create_goal_for_agent('a', 'shared', 0.5, True)
+        em.appraise_belief(0.8, None, ['shared'], [1.0])
+        store.create_agent('c')
+        store.create_agent('d')
+        self.assertIsNone(em.get_goal_by_name('shared'))
+
+        # the goal is paged in with its likelihood, not created again
+        store.create_agent('b')
+        goal = store.create_goal_for_agent('b', 'shared', 0.5, True)
+        self.assertAlmostEqual(goal.likelihood, 0.9)
+        self.assertIs(store.get_goal('shared'), goal)
+        self.assertIs(store.get('a').get_goal_by_name('shared'), goal)
+        store.flush()
+        row = store.connection.execute('SELECT likelihood FROM goals WHERE name = ?', ('shared',)).fetchone()
+        self.assertAlmostEqual(row[0], 0.9)
+
+    def test_load_observers(self):
+        em = Gamygdala()
+        store = AgentStore(em, capacity=3, batch_size=2)
+        self.create_world(em, store, 10)
+        store.get('npc7').update_relation('npc9', -0.5)
+        for i in range(10, 14):
+            store.create_agent(f'npc{i}')
+        observers = store.load_observers('npc9')
+        self.assertEqual([agent.name for agent in observers], ['npc7'])
+        observers = store.load_observers('npc0')
+        self.assertEqual(len(observers), 10)
+        self.assertTrue(all(em.get_agent_by_name(agent.name) is agent for agent in observers[-3:]))
+
+        # the observers feel for the owner once paged in
+        store.create_goal_for_agent('npc9', 'npc9 safe', 1.0, True)
+        store.load_observers('npc9')
+        em.appraise_belief(1.0, None, ['npc9 safe'], [1.0])
+        self.assertIn('resentment', [emotion.name for emotion in store.get('npc7').internal_state])
+
+    def test_persistence(self):
+        path = os.path.join(tempfile.mkdtemp(), 'world.db')
+        em = Gamygdala()
+        store = AgentStore(em, path, capacity=5)
+        self.create_world(em, store, 20)
+        em.appraise_belief(0.8, None, ['goal19'], [1.0])
+        store.close()
+
+        em = Gamygdala()
+        store = AgentStore(em, path, capacity=5)
+        self.assertIn('npc0', store)
+        self.assertNotIn('npc20', store)
+        npc = store.get('npc19')
+        self.assertAlmostEqual(npc.get_goal_by_name('goal19').likelihood, 0.9)
+        self.assertIn('hope', [emotion.name for emotion in npc.internal_state])
+
+if __name__ == "__main__":
+    unittest.main()
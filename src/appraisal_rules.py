@@ -0,0 +1,189 @@
+'''
+Class AppraisalRules
+This class holds the OCC appraisal logic of Gamygdala as precomputed dispatch tables.
+Instead of walking if/else chains for every appraisal, the engine classifies an event by a few discrete keys
+(sign of the utility, state of the goal likelihood, size of the likelihood change, sign of the relation and causal role)
+and looks up the list of rules (emotion name, intensity formula) registered for that cell.
+Extra rules (e.g. pride and shame for the SELF-SELF case) can be registered with add_internal_rule, add_social_rule and add_action_rule.
+'''
+
+# Signs (utility, desirability and relation like). Zero counts as positive, as in the original engine.
+POSITIVE = 0
+NEGATIVE = 1
+
+# Goal likelihood states
+UNCERTAIN = 0       # 0 < likelihood < 1
+CONFIRMED = 1       # likelihood == 1
+DISCONFIRMED = 2    # likelihood == 0
+
+# Delta likelihood classes, split at the -0.5, 0 and 0.5 thresholds used by the OCC rules
+DELTA_LARGE_DECREASE = 0    # delta < -0.5
+DELTA_DECREASE = 1          # -0.5 <= delta < 0
+DELTA_INCREASE = 2          # 0 <= delta < 0.5
+DELTA_LARGE_INCREASE = 3    # delta >= 0.5
+
+# Causal roles of agent actions, seen from the agent getting the emotion (self)
+SELF_OTHER = 0      # self is the affected agent, another agent caused the event
+SELF_SELF = 1       # self is the affected agent and the causal agent
+OTHER_SELF = 2      # another agent is affected, self caused the event
+
+# Built-in intensity formulas. A custom formula is a callable(utility, delta_likelihood, like) returning the intensity.
+INTENSITY_UTILITY_DELTA = 0         # |utility * delta_likelihood|
+INTENSITY_UTILITY_DELTA_LIKE = 1    # |utility * delta_likelihood * like|
+
+SIGNS = (POSITIVE, NEGATIVE)
+LIKELIHOOD_STATES = (UNCERTAIN, CONFIRMED, DISCONFIRMED)
+DELTA_CLASSES = (DELTA_LARGE_DECREASE, DELTA_DECREASE, DELTA_INCREASE, DELTA_LARGE_INCREASE)
+CAUSAL_ROLES = (SELF_OTHER, SELF_SELF, OTHER_SELF)
+
+
+def delta_class(delta_likelihood):
+    if delta_likelihood < 0:
+        return DELTA_LARGE_DECREASE if delta_likelihood < -0.5 else DELTA_DECREASE
+    return DELTA_INCREASE if delta_likelihood < 0.5 else DELTA_LARGE_INCREASE
+
+
+def intensity(formula, base, utility, delta_likelihood, like):
+    # base is the precomputed |utility * delta_likelihood| shared by all rules of a cell.
+    if formula == INTENSITY_UTILITY_DELTA:
+        return base
+    if formula == INTENSITY_UTILITY_DELTA_LIKE:
+        return base * abs(like)
+    return formula(utility, delta_likelihood, like)
+
+
+def _expand(value, domain):
+    # None is a wildcard for the whole domain, a list or tuple selects several values.
+    if value is None:
+        return domain
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return (value,)
+
+
+class AppraisalRules:
+    def __init__(self, defaults=True):
+        # Flat tables indexed by the keys above; each cell is a tuple of (emotion_name, formula) rules.
+        self.internal = [()] * (len(SIGNS) * len(LIKELIHOOD_STATES) * len(DELTA_CLASSES))
+        self.social = [()] * (len(SIGNS) * len(SIGNS))
+        self.actions = [()] * (len(CAUSAL_ROLES) * len(SIGNS) * len(SIGNS))
+        # True while all social rules use INTENSITY_UTILITY_DELTA_LIKE, which allows the vectorized social propagation
+        self.vectorized_social = True
+        if defaults:
+            self.add_default_rules()
+
+    '''
+    method copy
+    return {AppraisalRules}: A copy of the rules, that can be changed without changing these ones (the cells are tuples, shared).
+    '''
+    def copy(self):
+        rules = AppraisalRules(defaults=False)
+        rules.internal = list(self.internal)
+        rules.social = list(self.social)
+        rules.actions = list(self.actions)
+        rules.vectorized_social = self.vectorized_social
+        return rules
+
+    '''
+    Index helpers, the tables are flat lists so a lookup is one integer computation and one list access.
+    Internal: 2 utility signs x 3 likelihood states x 4 delta classes. Social: 2 x 2 signs. Actions: 3 roles x 2 x 2 signs.
+    '''
+    @staticmethod
+    def internal_index(utility_sign, state, delta):
+        return utility_sign * 12 + state * 4 + delta
+
+    @staticmethod
+    def social_index(desirability_sign, like_sign):
+        return desirability_sign * 2 + like_sign
+
+    @staticmethod
+    def action_index(role, desirability_sign, like_sign):
+        return role * 4 + desirability_sign * 2 + like_sign
+
+    '''
+    method add_internal_rule
+    Registers an internal emotion (an emotion that does not need a relation, such as hope or fear).
+    Params:
+    * emotion_name: The emotion to add to the goal owner.
+    * utility: POSITIVE or NEGATIVE sign of the goal utility (None for both).
+    * likelihood: UNCERTAIN, CONFIRMED or DISCONFIRMED goal likelihood state (None for all).
+    * delta: One or several DELTA_* classes of the likelihood change (None for all).
+    * formula: The intensity formula, INTENSITY_UTILITY_DELTA by default.
+    '''
+    def add_internal_rule(self, emotion_name, utility=None, likelihood=None, delta=None, formula=INTENSITY_UTILITY_DELTA):
+        for u in _expand(utility, SIGNS):
+            for s in _expand(likelihood, LIKELIHOOD_STATES):
+                for d in _expand(delta, DELTA_CLASSES):
+                    i = self.internal_index(u, s, d)
+                    self.internal[i] = self.internal[i] + ((emotion_name, formula),)
+
+    '''
+    method add_social_rule
+    Registers a social emotion felt by an agent that has a relation with the goal owner (happy-for, pity, etc.).
+    Params:
+    * emotion_name: The emotion to add to the observer and its relation with the goal owner.
+    * desirability: POSITIVE or NEGATIVE sign of the desirability for the goal owner (None for both).
+    * like: POSITIVE or NEGATIVE sign of the relation (None for both).
+    * formula: The intensity formula, INTENSITY_UTILITY_DELTA_LIKE by default.
+    '''
+    def add_social_rule(self, emotion_name, desirability=None, like=None, formula=INTENSITY_UTILITY_DELTA_LIKE):
+        if formula != INTENSITY_UTILITY_DELTA_LIKE:
+            self.vectorized_social = False
+        for ds in _expand(desirability, SIGNS):
+            for ls in _expand(like, SIGNS):
+                i = self.social_index(ds, ls)
+                self.social[i] = self.social[i] + ((emotion_name, formula),)
+
+    '''
+    method add_action_rule
+    Registers an emotion that depends on who caused the event (gratitude, anger, gratification, remorse, or pride and shame for SELF_SELF).
+    For SELF_OTHER, the relation is the one self has with the causal agent (created with like 0 if missing).
+    For OTHER_SELF, the relation is the one self has with the affected agent (no emotion if missing).
+    For SELF_SELF, there is no relation and the like sign is POSITIVE.
+    Params:
+    * emotion_name: The emotion to add to self.
+    * role: SELF_OTHER, SELF_SELF or OTHER_SELF.
+    * desirability: POSITIVE or NEGATIVE sign of the desirability for the affected agent (None for both).
+    * like: POSITIVE or NEGATIVE sign of the relation (None for both).
+    * formula: The intensity formula, INTENSITY_UTILITY_DELTA by default.
+    '''
+    def add_action_rule(self, emotion_name, role, desirability=None, like=None, formula=INTENSITY_UTILITY_DELTA):
+        for r in _expand(role, CAUSAL_ROLES):
+            for ds in _expand(desirability, SIGNS):
+                for ls in _expand(like, SIGNS):
+                    i = self.action_index(r, ds, ls)
+                    self.actions[i] = self.actions[i] + ((emotion_name, formula),)
+
+    '''
+    The default Gamygdala rules, equivalent to the original if/else appraisal logic.
+    '''
+    def add_default_rules(self):
+        # Uncertain goals: hope or fear depending on whether the change is good for the owner
+        self.add_internal_rule('hope', POSITIVE, UNCERTAIN, (DELTA_INCREASE, DELTA_LARGE_INCREASE))
+        self.add_internal_rule('fear', POSITIVE, UNCERTAIN, (DELTA_LARGE_DECREASE, DELTA_DECREASE))
+        self.add_internal_rule('hope', NEGATIVE, UNCERTAIN, (DELTA_LARGE_DECREASE, DELTA_DECREASE))
+        self.add_internal_rule('fear', NEGATIVE, UNCERTAIN, (DELTA_INCREASE, DELTA_LARGE_INCREASE))
+
+        # Confirmed goals (likelihood == 1)
+        self.add_internal_rule('satisfaction', POSITIVE, CONFIRMED, (DELTA_LARGE_DECREASE, DELTA_DECREASE, DELTA_INCREASE))
+        self.add_internal_rule('joy', POSITIVE, CONFIRMED)
+        self.add_internal_rule('fear-confirmed', NEGATIVE, CONFIRMED, (DELTA_LARGE_DECREASE, DELTA_DECREASE, DELTA_INCREASE))
+        self.add_internal_rule('distress', NEGATIVE, CONFIRMED)
+
+        # Disconfirmed goals (likelihood == 0)
+        self.add_internal_rule('disappointment', POSITIVE, DISCONFIRMED, DELTA_LARGE_DECREASE)
+        self.add_internal_rule('distress', POSITIVE, DISCONFIRMED)
+        self.add_internal_rule('relief', NEGATIVE, DISCONFIRMED, DELTA_LARGE_DECREASE)
+        self.add_internal_rule('joy', NEGATIVE, DISCONFIRMED)
+
+        # Social emotions
+        self.add_social_rule('happy-for', POSITIVE, POSITIVE)
+        self.add_social_rule('resentment', POSITIVE, NEGATIVE)
+        self.add_social_rule('pity', NEGATIVE, POSITIVE)
+        self.add_social_rule('gloating', NEGATIVE, NEGATIVE)
+
+        # Agent actions
+        self.add_action_rule('gratitude', SELF_OTHER, POSITIVE)
+        self.add_action_rule('anger', SELF_OTHER, NEGATIVE)
+        self.add_action_rule('gratification', OTHER_SELF, POSITIVE, POSITIVE, INTENSITY_UTILITY_DELTA_LIKE)
+        self.add_action_rule('remorse', OTHER_SELF, NEGATIVE, POSITIVE, INTENSITY_UTILITY_DELTA_LIKE)
@@ -0,0 +1,92 @@
+from belief import Belief
+
+'''
+Class BeliefQueue
+Frame-scoped queue of beliefs, used by Gamygdala in deferred mode (see Gamygdala.set_deferred).
+Beliefs are split per affected goal and queued; flush() coalesces the redundant updates and appraises them.
+Coalescing works on runs of consecutive beliefs for the same goal and the same causal agent:
+the final goal likelihood of a run is computed by replaying its beliefs (absolute beliefs set the likelihood, incremental ones add to it,
+with the same clamping and achievement goal locking as Gamygdala.calculate_delta_likelihood), and the run is appraised once with that final likelihood.
+Semantics compared to sequential appraisal:
+* the final goal likelihoods are the same (runs for different causal agents are appraised in order);
+* the emotions are the ones of the net likelihood change of each run, e.g. a goal going up then down in the same frame by the same agent gives no emotion;
+* goals with their own calculate_likelihood function, and goals unknown to Gamygdala, are not coalesced.
+Params:
+* gamygdala_instance: The Gamygdala instance which appraises the flushed beliefs.
+'''
+class BeliefQueue:
+    def __init__(self, gamygdala_instance):
+        self.gamygdala_instance = gamygdala_instance
+        self.runs = []
+        self.tails = {}
+        self.queued = 0
+
+    def __len__(self):
+        return self.queued
+
+    '''
+    method enqueue
+    Queues a belief, merging it into the last run of each affected goal if it has the same causal agent.
+    Params:
+    * belief: The Belief to queue.
+    '''
+    def enqueue(self, belief):
+        if len(belief.goal_congruences) != len(belief.affected_goal_names):
+            # Not ours to fix, appraise_all will report it at flush
+            self.runs.append(_Run(None, belief.causal_agent_name, belief))
+            self.queued += 1
+            return
+
+        for goal_name, congruence in zip(belief.affected_goal_names, belief.goal_congruences):
+            self.queued += 1
+            goal = self.gamygdala_instance.get_goal_by_name(goal_name)
+            if goal is None or callable(goal.calculate_likelihood):
+                self.runs.append(_Run(None, belief.causal_agent_name, Belief(belief.likelihood, belief.causal_agent_name, [goal_name], [congruence], belief.is_incremental)))
+                self.tails.pop(goal_name, None)
+                continue
+
+            run = self.tails.get(goal_name)
+            if run is None or run.causal_agent_name != belief.causal_agent_name:
+                run = _Run(goal, belief.causal_agent_name, None)
+                self.runs.append(run)
+                self.tails[goal_name] = run
+            run.updates.append((belief.likelihood, congruence, belief.is_incremental))
+
+    '''
+    method flush
+    Appraises all queued beliefs, one appraisal per run, and empties the queue.
+    return {int}: The number of appraisals performed.
+    '''
+    def flush(self):
+        runs = self.runs
+        self.runs = []
+        self.tails = {}
+        self.queued = 0
+
+        for run in runs:
+            if run.goal is None:
+                self.gamygdala_instance.appraise_all(run.belief)
+            else:
+                likelihood = run.final_likelihood()
+                # An absolute belief with congruence * likelihood = 2 * likelihood - 1 sets the goal likelihood to the final one.
+                self.gamygdala_instance.appraise_all(Belief(1.0, run.causal_agent_name, [run.goal.name], [2 * likelihood - 1], False))
+        return len(runs)
+
+class _Run:
+    def __init__(self, goal, causal_agent_name, belief):
+        self.goal = goal
+        self.causal_agent_name = causal_agent_name
+        self.belief = belief
+        self.updates = []
+
+    def final_likelihood(self):
+        # Replays calculate_delta_likelihood on the goal likelihood without appraising, evaluated at flush time.
+        likelihood = self.goal.likelihood
+        for belief_likelihood, congruence, is_incremental in self.updates:
+            if not self.goal.is_maintenance_goal and likelihood is not None and (likelihood >= 1 or likelihood <= 0):
+                break
+            if is_incremental and likelihood is not None:
+                likelihood = max(min(likelihood + belief_likelihood * congruence, 1), 0)
+            else:
+                likelihood = (congruence * belief_likelihood + 1.0) / 2.0
+        return likelihood
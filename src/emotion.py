@@ -1,11 +1,47 @@
-'''
-Class Emotion
-This class is mainly a data structure to store an emotion with its intensity
-Params:
-* name: The string ref of the emotion
-* intensity: The intensity at which the emotion is set upon construction.
-'''
-class Emotion:
-    def __init__(self, name, intensity):
-        self.name = name
-        self.intensity = intensity
\ No newline at end of file
+'''
+Class Emotion
+This class is mainly a data structure to store an emotion with its intensity
+Params:
+* name: The string ref of the emotion
+* intensity: The intensity at which the emotion is set upon construction.
+'''
+class Emotion:
+    def __init__(self, name, intensity):
+        self.name = name
+        self.intensity = intensity
+
+'''
+method decay_emotions
+Decays a list of emotions in place, and removes the ones that get close to 0.
+Params:
+* emotions: The list of emotions (an agent's internal state or a relation's emotion list).
+* rates: (default, by_emotion) decay rates, see Gamygdala.decay_rates.
+* tolerance: Emotions whose decayed intensity is within tolerance of 0 are removed.
+return {list}: The removed emotions.
+'''
+def decay_emotions(emotions, rates, tolerance):
+    default, by_emotion = rates
+    multiplier, offset, function = default
+    kept = []
+    removed = []
+    if by_emotion or function is not None:
+        for emotion in emotions:
+            multiplier, offset, function = by_emotion.get(emotion.name, default)
+            intensity = emotion.intensity * multiplier - offset if function is None else function(emotion.intensity)
+            if intensity > tolerance or intensity < -tolerance:
+                emotion.intensity = intensity
+                kept.append(emotion)
+            else:
+                removed.append(emotion)
+    else:
+        # same rate for all emotions
+        for emotion in emotions:
+            intensity = emotion.intensity * multiplier - offset
+            if intensity > tolerance or intensity < -tolerance:
+                emotion.intensity = intensity
+                kept.append(emotion)
+            else:
+                removed.append(emotion)
+    if removed:
+        emotions[:] = kept
+    return removed
\ No newline at end of file
@@ -0,0 +1,324 @@
+from agent import Agent
+from emotion import Emotion
+from gamygdala import Gamygdala
+from goal import Goal
+from relation import Relation
+from relation_graph import RelationGraph
+
+'''
+Class WorldFork
+A copy-on-write fork of a Gamygdala instance, for what-if appraisal (see Gamygdala.fork).
+A fork is a Gamygdala instance whose agents are views over the agents of the base world: goals, emotional states and relations
+are only copied when the fork changes them, so a fork is cheap to create and the base world is never modified.
+Speculative beliefs are appraised with the usual appraise_belief, and emotion_deltas / pad_deltas report what changed.
+A fork is discarded by simply dropping it. It should not be used anymore once the base world has changed.
+The appraisal work still pending in the base world (see Gamygdala.set_budget) is not part of the fork.
+Params:
+* base: The Gamygdala instance to fork.
+'''
+class WorldFork(Gamygdala):
+    def __init__(self, base):
+        # A fresh engine (no deferred, bounded or history modes), with the configuration of the base world and its state copied on write
+        super().__init__()
+        self.base = base
+        # the rule tables are small, copied now as they can be changed through fork.rules; the PAD maps are copied by register_emotion
+        self.rules = base.rules.copy()
+        self.emotion_pad = base.emotion_pad
+        self.decay_factor = base.decay_factor
+        if getattr(base.decay_function, '__self__', None) is base:
+            self.decay_function = getattr(self, base.decay_function.__name__)
+        else:
+            self.decay_function = base.decay_function
+        self.last_millis = base.last_millis
+        self.millis_passed = base.millis_passed
+        self.min_intensity = base.min_intensity
+        self.min_like = base.min_like
+        self.min_desirability = base.min_desirability
+        self.decay_profiles = dict(base.decay_profiles)
+        self.decay_agents = base.decay_agents
+        self.decay_archetypes = base.decay_archetypes
+        self.relation_graph = ForkRelationGraph(self)
+        self.agents = [AgentView(agent, self) for agent in base.agents]
+        self.agent_index = {view.name: view for view in self.agents}
+        self.new_agents = []
+        self.goal_copies = {}
+        self.new_goals = []
+        self.touched = []
+
+    @property
+    def goals(self):
+        # Goals are copied by get_goal_by_name, the ones listed here that are not copied yet must not be changed
+        return [self.goal_copies.get(goal.name, goal) for goal in self.base.goals] + self.new_goals
+
+    @goals.setter
+    def goals(self, goals):
+        # The goals of the base world are always part of the fork, only the new ones can be set
+        self.new_goals = list(goals)
+
+    def register_agent(self, agent):
+        # Agents created in the fork are plain agents, owned by the fork
+        super().register_agent(agent)
+        if not isinstance(agent, AgentView):
+            self.new_agents.append(agent)
+
+    def register_emotion(self, emotion_name, pad):
+        # the PAD maps are shared with the base world until the fork changes them
+        if self.emotion_pad is self.base.emotion_pad:
+            self.emotion_pad = dict(self.base.emotion_pad)
+        for agent in self.agents:
+            if isinstance(agent, AgentView) and agent.map_pad is agent.base.map_pad:
+                agent.map_pad = dict(agent.base.map_pad)
+        super().register_emotion(emotion_name, pad)
+
+    def register_goal(self, goal):
+        if self.get_goal_by_name(goal.name) is None:
+            self.new_goals.append(goal)
+            self.goal_copies[goal.name] = goal
+        else:
+            print(f"Warning: failed adding a second goal with the same name: {goal.name}")
+
+    def get_goal_by_name(self, goal_name):
+        goal = self.goal_copies.get(goal_name)
+        if goal is None:
+            base_goal = self.base.get_goal_by_name(goal_name)
+            if base_goal is None:
+                return None
+            goal = Goal(base_goal.name, base_goal.utility, base_goal.is_maintenance_goal)
+            goal.likelihood = base_goal.likelihood
+            goal.calculate_likelihood = base_goal.calculate_likelihood
+            self.goal_copies[goal_name] = goal
+        return goal
+
+    '''
+    method emotion_deltas
+    return {dict}: agent name -> {emotion name -> change of intensity}, for the agents whose emotional state changed in the fork
+    (agents created in the fork start from no emotion).
+    '''
+    def emotion_deltas(self):
+        deltas = {}
+        for view in self.touched + self.new_agents:
+            before = {emotion.name: emotion.intensity for emotion in view.base.internal_state} if isinstance(view, AgentView) else {}
+            after = {emotion.name: emotion.intensity for emotion in view.internal_state}
+            delta = {name: after.get(name, 0.0) - before.get(name, 0.0) for name in after.keys() | before.keys()}
+            delta = {name: value for name, value in delta.items() if value != 0}
+            if delta:
+                deltas[view.name] = delta
+        return deltas
+
+    '''
+    method pad_deltas
+    Param:
+    * use_gain: Whether to compare the gained PAD states.
+    return {dict}: agent name -> [pleasure, arousal, dominance] changes, for the agents whose emotional state changed in the fork.
+    '''
+    def pad_deltas(self, use_gain=False):
+        deltas = {}
+        for view in self.touched + self.new_agents:
+            after = view.get_pad_state(use_gain)
+            before = view.base.get_pad_state(use_gain) if isinstance(view, AgentView) else [0, 0, 0]
+            if after != before:
+                deltas[view.name] = [a - b for a, b in zip(after, before)]
+        return deltas
+
+    '''
+    method goal_deltas
+    return {dict}: goal name -> (likelihood in the base world, likelihood in the fork), for the goals whose likelihood changed.
+    '''
+    def goal_deltas(self):
+        deltas = {}
+        for name, goal in self.goal_copies.items():
+            base_goal = self.base.get_goal_by_name(name)
+            before = base_goal.likelihood if base_goal is not None else None
+            if goal.likelihood != before:
+                deltas[name] = (before, goal.likelihood)
+        return deltas
+
+'''
+Class AgentView
+Copy-on-write view of an agent in a WorldFork. Reads go to the base agent until the view changes its emotional state or relations.
+'''
+class AgentView(Agent):
+    def __init__(self, base, fork):
+        # Agent.__init__ is not called, the view reads everything from the base agent
+        self.base = base
+        self.name = base.name
+        self.archetype = base.archetype
+        self.gain = base.gain
+        self.map_pad = base.map_pad
+        self.gamygdala_instance = fork
+        self.history = None
+        self.new_goals = []
+        self._internal_state = None
+        self._relations = None
+        self._copied = set()
+
+    @property
+    def goals(self):
+        goal_copies = self.gamygdala_instance.goal_copies
+        return [goal_copies.get(goal.name, goal) for goal in self.base.goals] + self.new_goals
+
+    def add_goal(self, goal):
+        self.new_goals.append(goal)
+
+    def remove_goal(self, goal_name):
+        print('Error: goals of the base world cannot be removed in a fork')
+        return False
+
+    def get_goal_by_name(self, goal_name):
+        if self.base.has_goal(goal_name):
+            return self.gamygdala_instance.get_goal_by_name(goal_name)
+        for goal in self.new_goals:
+            if goal.name == goal_name:
+                return goal
+        return None
+
+    '''
+    Emotional state, copied on the first write
+    '''
+    @property
+    def internal_state(self):
+        return self.base.internal_state if self._internal_state is None else self._internal_state
+
+    def _copy_internal_state(self):
+        if self._internal_state is None:
+            self._internal_state = [Emotion(emotion.name, emotion.intensity) for emotion in self.base.internal_state]
+            self.gamygdala_instance.touched.append(self)
+
+    def add_intensity(self, emotion_name, intensity):
+        self._copy_internal_state()
+        Agent.add_intensity(self, emotion_name, intensity)
+
+    '''
+    Relations, each one copied on the first access through get_relation (the engine changes the relations it gets)
+    '''
+    @property
+    def current_relations(self):
+        if self._relations is None:
+            return self.base.current_relations
+        return list(self._relations.values())
+
+    def _copy_relations(self):
+        if self._relations is None:
+            self._relations = {relation.agent_name: relation for relation in self.base.current_relations}
+
+    def get_relation(self, agent_name):
+        if self._relations is None:
+            relation = self.base.get_relation(agent_name)
+            if relation is None:
+                return None
+            self._copy_relations()
+        else:
+            relation = self._relations.get(agent_name)
+            if relation is None:
+                return None
+        if agent_name in self._copied:
+            return relation
+        return self._copy_relation(relation)
+
+    def _copy_relation(self, relation):
+        if self._relations is None:
+            self._copy_relations()
+        copy = Relation(relation.agent_name, relation.like)
+        copy.emotion_list = [Emotion(emotion.name, emotion.intensity) for emotion in relation.emotion_list]
+        self._relations[relation.agent_name] = copy
+        self._copied.add(relation.agent_name)
+        return copy
+
+    def has_relation_with(self, agent_name):
+        if self._relations is None:
+            return self.base.has_relation_with(agent_name)
+        return agent_name in self._relations
+
+    def update_relation(self, agent_name, like):
+        relation = self.get_relation(agent_name)
+        if relation is None:
+            self._copy_relations()
+            relation = Relation(agent_name, like)
+            self._relations[agent_name] = relation
+            self._copied.add(agent_name)
+            self.gamygdala_instance.relation_graph.add_relation(self, relation)
+        else:
+            relation.like = like
+
+    def decay(self, gamygdala_instance):
+        self._copy_internal_state()
+        for relation in list(self.current_relations):
+            self.get_relation(relation.agent_name)
+        Agent.decay(self, gamygdala_instance)
+
+'''
+Class ForkRelationGraph
+Relation graph of a WorldFork. As long as the fork does not change likes, it reuses the CSR arrays of the base world,
+and maps observers and relations to their views and copies on access, the relations created in the fork being added aside.
+Otherwise it is rebuilt over the fork's agents.
+'''
+class ForkRelationGraph(RelationGraph):
+    def __init__(self, fork):
+        super().__init__()
+        self.fork = fork
+        self.shared = True
+        self.base_observers = None
+        self.like_version = Relation.like_version
+
+    def invalidate(self):
+        self.dirty = True
+        self.shared = False
+
+    def add_relation(self, observer, relation):
+        if self.shared and self.dirty:
+            # not synchronized with the base world yet, the shared arrays would miss it
+            self.invalidate()
+            return
+        super().add_relation(observer, relation)
+
+    def update(self, agents):
+        if self.like_version != Relation.like_version:
+            # a like changed (in the fork, as the base world does not change while it is forked)
+            self.invalidate()
+        if self.shared:
+            base = self.fork.base.relation_graph.update(self.fork.base.agents)
+            if self.base_observers is not base.observers:
+                self.base_observers = base.observers
+                self.agent_ids = base.agent_ids
+                self.indptr = base.indptr
+                self.likes = base.likes
+                self.likes_array = base.likes_array
+                self.observers = _ViewSequence(base.observers, self.fork.agent_index)
+                self.relations = _RelationSequence(self.observers, base.relations)
+                # the relations added in the fork are kept aside (see RelationGraph.add_relation)
+                self.dirty = False
+        elif self.dirty or self.agent_count != len(agents):
+            self.rebuild(agents)
+            self.relations = _RelationSequence(self.observers, self.relations)
+        return self
+
+class _ViewSequence:
+    def __init__(self, agents, agent_index):
+        self.agents = agents
+        self.agent_index = agent_index
+
+    def __getitem__(self, k):
+        return self.agent_index[self.agents[k].name]
+
+    def __len__(self):
+        return len(self.agents)
+
+class _RelationSequence:
+    def __init__(self, observers, relations):
+        self.observers = observers
+        self.relations = relations
+
+    def __getitem__(self, k):
+        # The relation is copied by its observer's view on first access, agents created in the fork own their relations
+        observer = self.observers[k]
+        relation = self.relations[k]
+        if not isinstance(observer, AgentView):
+            return relation
+        if observer._relations is not None:
+            if relation.agent_name in observer._copied:
+                return observer._relations[relation.agent_name]
+            relation = observer._relations.get(relation.agent_name, relation)
+        return observer._copy_relation(relation)
+
+    def __len__(self):
+        return len(self.relations)
@@ -1,486 +1,811 @@
-import time
-import math
-from agent import Agent
-from belief import Belief
-from goal import Goal
-from emotion import Emotion
-
-'''
-Gamydala emotion engine
-Python Port
-Original code: https://github.com/broekens/gamygdala
-'''
-class Gamygdala:
-    def __init__(self):
-        self.agents = []
-        self.goals = []
-        self.decay_function = self.exponential_decay
-        self.decay_factor = 0.8
-        self.last_millis = int(time.time() * 1000)
-        self.millis_passed = 0
-        self.debug = False
-
-    '''
-    Method create_agent
-    A facilitator method that creates a new Agent and registers it for you
-    Params:
-    * agent_name: The agent with agentName is created
-    return {Agent}: An agent reference to the newly created agent
-    '''
-    def create_agent(self, agent_name):
-        agent = Agent(agent_name)
-        self.register_agent(agent)
-        return agent
-
-    '''
-    method create_goal_for_agent
-    A facilitator method to create a goal for a particular agent, that also registers the goal to the agent and gamygdala.
-    This method is thus handy if you want to keep all gamygdala logic internal to Gamygdala.
-    However, if you want to do more sophisticated stuff (e.g., goals for multiple agents, keep track of your own list of goals to also remove them, appraise events per agent without the need for gamygdala to keep track of goals, etc...) this method will probably be doing too much.
-    Params:
-    * agent_name: The agent's name to which the newly created goal has to be added.
-    * goal_name: The goal's name.
-    * goal_utility: The goal's utility.
-    * is_maintenance_goal: Defines if the goal is a maintenance goal or not [optional]. The default is that the goal is an achievement goal, i.e., a goal that once it's likelihood reaches true (1) or false (-1) stays that way.
-    return {Goal} a goal reference to the newly created goal.
-    '''
-    def create_goal_for_agent(self, agent_name, goal_name, goal_utility, is_maintenance_goal=False):
-        temp_agent = self.get_agent_by_name(agent_name)
-        if temp_agent:
-            temp_goal = self.get_goal_by_name(goal_name)
-
-            if temp_goal:
-                print(f"Warning: I cannot make a new goal with the same name {goal_name} as one is registered already. I assume the goal is a common goal and will add the already known goal with that name to the agent {agent_name}")
-            else:
-                temp_goal = Goal(goal_name, goal_utility)
-                self.register_goal(temp_goal)
-
-            temp_agent.add_goal(temp_goal)
-
-            if is_maintenance_goal:
-                temp_goal.is_maintenance_goal = is_maintenance_goal
-            return temp_goal
-        else:
-            print(f"Error: agent with name {agent_name} does not exist, so I cannot create a goal for it.")
-            return None
-
-    '''
-    method create_relation
-    A facilitator method to create a relation between two agents. Both source and target have to exist and be registered with this Gamygdala instance.
-    This method is thus handy if you want to keep all gamygdala logic internal to Gamygdala.
-    Params:
-    * source_name: The agent who has the relation (the source)
-    * target_name: The agent who is the target of the relation (the target)
-    * relation: The relation (between -1 and 1).
-    '''
-    def create_relation(self, source_name, target_name, relation):
-        source = self.get_agent_by_name(source_name)
-        target = self.get_agent_by_name(target_name)
-        if source and target and -1 <= relation <= 1:
-            source.update_relation(target_name, relation)
-        else:
-            print(f'Error: cannot relate {source} to {target} with intensity {relation}')
-
-    '''
-    method appraise_belief
-    A facilitator method to appraise an event. It takes in the same as what the new Belief(...) takes in, creates a belief and appraises it for all agents that are registered.
-    This method is thus handy if you want to keep all gamygdala logic internal to Gamygdala.
-    Params:
-    * likelihood: The likelihood of this belief to be true.
-    * causal_agent_name: The agent's name of the causal agent of this belief.
-    * affected_goal_names: An array of affected goals' names.
-    * goal_congruences: An array of the affected goals' congruences (i.e., the extend to which this event is good or bad for a goal [-1,1]).
-    * is_incremental: Incremental evidence enforces gamygdala to see this event as incremental evidence for (or against) the list of goals provided, i.e, it will add or subtract this belief's likelihood*congruence from the goal likelihood instead of using the belief as "state" defining the absolute likelihood
-    '''
-    def appraise_belief(self, likelihood, causal_agent_name, affected_goal_names, goal_congruences, is_incremental=False):
-        temp_belief = Belief(likelihood, causal_agent_name, affected_goal_names, goal_congruences, is_incremental)
-        #self.appraise(temp_belief)
-        self.appraise_all(temp_belief)
-
-    '''
-    method print_all_emotions
-    Facilitator method to print all emotional states to the console.	
-    Param:
-    * gain: Whether you want to print the gained (true) emotional states or non-gained (false).
-    '''
-    def print_all_emotions(self, gain):
-        for agent in self.agents:
-            agent.print_emotional_state(gain)
-            agent.print_relations(None)
-
-    '''
-    method set_gain
-    Facilitator to set the gain for the whole set of agents known to Gamygdala.
-    For more realistic, complex games, you would typically set the gain for each agent type separately, to finetune the intensity of the response.
-    Param:
-    * gain: The gain value [0 and 20].
-    '''
-    def set_gain(self, gain):
-        for agent in self.agents:
-            agent.set_gain(gain)
-
-    '''
-    method set_decay
-    Sets the decay factor and function for emotional decay.
-    It sets the decay factor and type for emotional decay, so that an emotion will slowly get lower in intensity.
-    Whenever decayAll is called, all emotions for all agents are decayed according to the factor and function set here.
-    Params:
-    * decay_factor: The decay factor used. A factor of 1 means no decay, a factor 
-    * decay_function: The decay function to be used. Choose between linearDecay or exponentialDecay (see the corresponding methods)
-    '''
-    def set_decay(self, decay_factor, decay_function):
-        self.decay_function = decay_function
-        self.decay_factor = decay_factor
-
-    '''
-    This starts the actual gamygdala decay process. It simply calls decayAll() at the specified interval.
-    The time_ms only defines the interval at which to decay, not the rate over time, that is defined by the decay_factor and function.
-    For more complex games (e.g., games where agents are not active when far away from the player, or games that do not need all agents to decay all the time) you should yourself choose when to decay agents individually.
-    To do so you can simply call the agent.decay() method (see the agent class).
-    Param:
-    * time_ms: The "framerate" of the decay in milliseconds. 
-    '''
-    def start_decay(self, time_ms):
-        import threading
-        threading.Timer(time_ms / 1000, self.decay_all).start()
-
-    '''
-    ///////////////////////////////////////////////////////////////////////
-    //Below this is more detailed gamygdala stuff to use it more flexibly.
-    ///////////////////////////////////////////////////////////////////////
-    '''
-    def register_agent(self, agent):
-        self.agents.append(agent)
-        agent.gamygdala_instance = self
-
-    def get_agent_by_name(self, agent_name):
-        for agent in self.agents:
-            if agent.name == agent_name:
-                return agent
-        print(f'Warning: agent {agent_name} not found')
-        return None
-
-    def register_goal(self, goal):
-        # TO CHECK: get_goal_by_name already checked?
-        if self.get_goal_by_name(goal.name) is None:
-            self.goals.append(goal)
-        else:
-            print(f"Warning: failed adding a second goal with the same name: {goal.name}")
-
-    def get_goal_by_name(self, goal_name):
-        for goal in self.goals:
-            if goal.name == goal_name:
-                return goal
-        return None
-
-    '''
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    Appraise
-    These methods is the main emotional interpretation logic entry point. It performs the complete appraisal of a single event (belief) for all agents (appraise_all) or for only one agent (appraise_agent)
-    this is sometimes needed for efficiency, if you as a game developer know that particular agents can never appraise an event, then you can force Gamygdala to only look at a subset of agents.
-    Gamygdala assumes that the affected_agent is indeed the only goal owner affected, that the belief is well-formed, and will not perform any checks, nor use Gamygdala's list of known goals to find other agents that share this goal (!!!)
-    Params:
-    * belief: The current event, in the form of a Belief object, to be appraised
-    * affected_agent: The reference to the agent who needs to appraise the event. If given, this is the appraisal perspective (see explanation above).
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    '''
-
-    '''
-    Appraise a specific agent
-    '''
-    def appraise_agent(self, belief, affected_agent):
-        # check only affected_agent (which can be much faster) and does not involve console output nor checks
-        for i, goal_name in enumerate(belief.affected_goal_names):
-            # Loop through every goal in the list of affected goals by this event.
-            current_goal = affected_agent.get_goal_by_name(goal_name)
-            utility = current_goal.utility
-            delta_likelihood = self.calculate_delta_likelihood(current_goal, belief.goal_congruences[i], belief.likelihood, belief.is_incremental)
-            desirability = delta_likelihood * utility
-
-            # assume affected_agent is the only owner to be considered in this appraisal round.
-            owner = affected_agent
-
-            self.evaluate_internal_emotion(utility, delta_likelihood, current_goal.likelihood, owner)
-            self.agent_actions(owner.name, belief.causal_agent_name, owner.name, desirability, utility, delta_likelihood)
-
-            # now check if anyone has a relation to this goal owner, and update the social emotions accordingly.
-            for agent in self.agents:
-                relation = agent.get_relation(owner.name)
-                if relation is not None:
-                    if self.debug:
-                        print(f'{agent.name} has a relationship with {owner.name}')
-                        print(relation)
-
-                    # The agent has relationship with the goal owner which has nonzero utility, add relational effects to the relations for agent[k].
-                    self.evaluate_social_emotion(utility, desirability, delta_likelihood, relation, agent)
-
-                    # also add remorse and gratification if conditions are met within (i.e., agent[k] did something bad/good for owner)
-                    self.agent_actions(owner.name, belief.causal_agent_name, agent.name, desirability, utility, delta_likelihood)
-                else:
-                    if self.debug:
-                        print(f'{agent.name} has NO relationship with {owner.name}')
-
-    '''
-    Appraise all agents
-    '''
-    def appraise_all(self, belief):
-        # check all
-        if self.debug:
-            print(belief)
-
-        if len(belief.goal_congruences) != len(belief.affected_goal_names):
-            print("Error: the congruence list was not of the same length as the affected goal list")
-            print(belief.goal_congruences)
-            print(belief.affected_goal_names)
-            return False  # The congruence list must be of the same length as the affected goals list.
-
-        if len(self.goals) == 0:
-            print("Warning: no goals registered to Gamygdala, all goals to be considered in appraisal need to be registered.")
-            return False  # No goals registered to GAMYGDALA.
-
-        # Loop through every goal in the list of affected goals by this event.
-        for i, goal_name in enumerate(belief.affected_goal_names):
-            current_goal = self.get_goal_by_name(goal_name)
-
-            if current_goal is not None:
-                # the goal exists, appraise it
-                utility = current_goal.utility
-                delta_likelihood = self.calculate_delta_likelihood(current_goal, belief.goal_congruences[i], belief.likelihood, belief.is_incremental)
-                desirability = delta_likelihood * utility
-
-                if self.debug:
-                    print(f"Desirability = {desirability:.2f}")
-
-                # now find the owners, and update their emotional states
-                for owner in self.agents:
-                    #if agent.has_goal(current_goal.name):
-                    #    owner = agent
-
-                    # Fix 10/10/2024 : evaluate emotions only if agent has a goal 
-                    if owner.has_goal(current_goal.name):
-                        if self.debug:
-                            print(f'....owned by {owner.name}')
-                        self.evaluate_internal_emotion(utility, delta_likelihood, current_goal.likelihood, owner)
-                        self.agent_actions(owner.name, belief.causal_agent_name, owner.name, desirability, utility, delta_likelihood)
-
-                    # now check if anyone has a relation to this goal owner, and update the social emotions accordingly.
-                    for other_agent in self.agents:
-                        relation = other_agent.get_relation(owner.name)
-                        if relation is not None:
-                            if self.debug:
-                                print(f'{other_agent.name} has a relationship with {owner.name}')
-                                print(relation)
-
-                                # The agent has relationship with the goal owner which has nonzero utility, add relational effects to the relations for agent[k].
-                                self.evaluate_social_emotion(utility, desirability, delta_likelihood, relation, other_agent)
-
-                                # also add remorse and gratification if conditions are met within (i.e., agent[k] did something bad/good for owner)
-                                self.agent_actions(owner.name, belief.causal_agent_name, other_agent.name, desirability, utility, delta_likelihood)
-                            else:
-                                if self.debug:
-                                    print(f'{other_agent.name} has NO relationship with {owner.name}')
-
-        # print the emotions to the console for debugging
-        if self.debug:
-            self.print_all_emotions(True)
-
-    def calculate_delta_likelihood(self, goal, congruence, belief_likelihood, is_incremental):
-        # Defines the change in a goal's likelihood due to the congruence and likelihood of a current event.
-        # We cope with two types of beliefs: incremental and absolute beliefs. Incrementals have their likelihood added to the goal, absolute define the current likelihood of the goal
-        # And two types of goals: maintenance and achievement. If an achievement goal (the default) is -1 or 1, we can't change it any more (unless externally and explicitly by changing the goal.likelihood).
-        old_likelihood = goal.likelihood
-        new_likelihood = None
-
-        # Added bug Fix : if not goal.is_maintenance_goal and (old_likelihood >= 1 or old_likelihood <= -1):
-        if not goal.is_maintenance_goal and old_likelihood is not None and (old_likelihood >= 1 or old_likelihood <= 0):
-            return 0
-
-        if hasattr(goal, 'calculate_likelihood') and callable(goal.calculate_likelihood):
-            # If the goal has an associated function to calculate the likelihood that the goal is true, then use that function
-            new_likelihood = goal.calculate_likelihood()
-        else:
-            # Otherwise use the event encoded updates
-            # Added bug Fix : check for old_likelihood is Not None
-            if is_incremental and old_likelihood is not None:
-                new_likelihood = old_likelihood + belief_likelihood * congruence
-                # Added Joost fix 07/10/2024 : new_likelihood = max(min(new_likelihood, 1), -1)
-                new_likelihood = max(min(new_likelihood, 1), 0)
-            else:
-                new_likelihood = (congruence * belief_likelihood + 1.0) / 2.0
-
-        goal.likelihood = new_likelihood
-        if self.debug:
-            print(f"Updated Goal likelihood = {new_likelihood:.2f}")
-
-        if old_likelihood is not None:
-            if self.debug:
-                print(f"Goal Delta likelihood = {new_likelihood - old_likelihood:.2f}")
-            return new_likelihood - old_likelihood
-        else:
-            if self.debug:
-                print(f"Goal likelihood: new = {new_likelihood:.2f}")
-            return new_likelihood
-    
-    '''
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    Internal Consequence of Events
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    '''
-    def evaluate_internal_emotion(self, utility, delta_likelihood, goal_likelihood, agent):
-        # This method evaluates the event in terms of internal emotions that do not need relations to exist, such as hope, fear, etc.
-        positive = False
-        intensity = 0
-        emotion = []
-
-        # if goal likelihood is not confirmed, emotions is between hope and fear depending on utility
-        if utility >= 0:
-            positive = delta_likelihood >= 0
-        else:
-            positive = delta_likelihood < 0
-
-        if 0 < goal_likelihood < 1:
-            emotion.append('hope' if positive else 'fear')
-
-        # if goal likelihood == 1 (desired) emotion between joy and distress depends on utility
-        elif goal_likelihood == 1:
-            if utility >= 0:
-                if delta_likelihood < 0.5:
-                    emotion.append('satisfaction')
-                emotion.append('joy')
-            else:
-                if delta_likelihood < 0.5:
-                    emotion.append('fear-confirmed')
-                emotion.append('distress')
-
-        # if goal likelihood == 0 (not desired) emotion between distress and joy depends on utility
-        elif goal_likelihood == 0:
-            if utility >= 0:
-                # Joost fix 07/10/2024 for if delta_likelihood > 0.5:
-                if delta_likelihood < -0.5:
-                    emotion.append('disappointment')
-                emotion.append('distress')
-            else:
-                # Joost fix 07/10/2024 for if delta_likelihood > 0.5:
-                if delta_likelihood < -0.5:
-                    emotion.append('relief')
-                emotion.append('joy')
-
-        intensity = abs(utility * delta_likelihood)
-
-        if self.debug:
-            print(f"Internal emotion intensity = {intensity:.2f}")
-
-        if intensity != 0:
-            for emotion_name in emotion:
-                agent.update_emotional_state(Emotion(emotion_name, intensity))
-
-    '''
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    Social Consequence of Events
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    '''
-    def evaluate_social_emotion(self, utility, desirability, delta_likelihood, relation, agent):
-        # This function is used to evaluate happy-for, pity, gloating or resentment.
-        # Emotions that arise when we evaluate events that affect goals of others.
-        # The desirability is the desirability from the goal owner's perspective.
-        # The agent is the agent getting evaluated (the agent that gets the social emotion added to his emotional state).
-        # The relation is a relation object between the agent being evaluated and the goal owner of the affected goal.
-
-        if self.debug:
-            print(f"Social Emotion: Desirability = {desirability:.2f}, Relation.like = {relation.like:.2f}")
-
-        emotion = Emotion(None, None)
-            
-        if desirability >= 0:
-            if relation.like >= 0:
-                emotion.name = 'happy-for'
-            else:
-                emotion.name = 'resentment'
-        else:
-            if relation.like >= 0:
-                emotion.name = 'pity'
-            else:
-                emotion.name = 'gloating'
-            
-        emotion.intensity = abs(utility * delta_likelihood * relation.like)
-
-        if self.debug:
-            print(f"Social emotion intensity = {emotion.intensity:.2f}")
-
-        if emotion.intensity != 0:
-            relation.add_emotion(emotion)
-            agent.update_emotional_state(emotion)  # also add relation emotion to the emotional state
-
-    '''
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    Actions of Agents
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    '''
-    def agent_actions(self, affected_name, causal_name, self_name, desirability, utility, delta_likelihood):
-        if causal_name is not None and causal_name != '':
-            # If the causal agent is null or empty, then we assume the event was not caused by an agent.
-            # There are three cases here:
-            # 1. The affected agent is SELF and causal agent is other.
-            # 2. The affected agent is SELF and causal agent is SELF.
-            # 3. The affected agent is OTHER and causal agent is SELF.
-            emotion = Emotion(None, None)
-                
-            if affected_name == self_name and self_name != causal_name:
-                # Case one : SELF-OTHER
-                if desirability >= 0:
-                    emotion.name = 'gratitude'
-                else:
-                    emotion.name = 'anger'
-                    
-                emotion.intensity = abs(utility * delta_likelihood)
-                self_agent = self.get_agent_by_name(self_name)
-                    
-                if self_agent.has_relation_with(causal_name):
-                    relation = self_agent.get_relation(causal_name)
-                else:
-                    self_agent.update_relation(causal_name, 0.0)
-                    relation = self_agent.get_relation(causal_name)
-                    
-                relation.add_emotion(emotion)
-                self_agent.update_emotional_state(emotion)  # also add relation emotion to the emotional state
-                
-            elif affected_name == self_name and self_name == causal_name:
-                    # Case two : SELF-SELF
-                    # This case is not included in Gamygdala.
-                    # This should include pride and shame
-                    pass
-                
-            elif affected_name != self_name and causal_name == self_name:
-                # Case three : OTHER-SELF
-                causal_agent = self.get_agent_by_name(causal_name)
-                if causal_agent.has_relation_with(affected_name):
-                    relation = causal_agent.get_relation(affected_name)
-                    if desirability >= 0:
-                        if relation.like >= 0:
-                            emotion.name = 'gratification'
-                            emotion.intensity = abs(utility * delta_likelihood * relation.like)
-                            relation.add_emotion(emotion)
-                            causal_agent.update_emotional_state(emotion)  # also add relation emotion to the emotional state
-                    else:
-                        if relation.like >= 0:
-                            emotion.name = 'remorse'
-                            emotion.intensity = abs(utility * delta_likelihood * relation.like)
-                            relation.add_emotion(emotion)
-                            causal_agent.update_emotional_state(emotion)  # also add relation emotion to the emotional state
-
-    '''
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    Decay methods
-    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
-    '''
-    def decay_all(self):
-        self.millis_passed = int(time.time() * 1000) - self.last_millis
-        self.last_millis = int(time.time() * 1000)
-        for agent in self.agents:
-            agent.decay(self)
-
-    def linear_decay(self, value):
-        return value - self.decay_factor * (self.millis_passed / 1000)
-
-    def exponential_decay(self, value):
+import time
+import math
+import itertools
+from agent import Agent
+from belief import Belief
+from goal import Goal
+from belief_queue import BeliefQueue
+from history import EmotionHistory
+from work_queue import WorkQueue
+from relation_graph import RelationGraph
+from appraisal_rules import AppraisalRules, POSITIVE, NEGATIVE, SELF_OTHER, SELF_SELF, OTHER_SELF, UNCERTAIN, CONFIRMED, DISCONFIRMED, \
+    INTENSITY_UTILITY_DELTA, INTENSITY_UTILITY_DELTA_LIKE, delta_class, intensity
+
+'''
+Gamydala emotion engine
+Python Port
+Original code: https://github.com/broekens/gamygdala
+'''
+class Gamygdala:
+    def __init__(self):
+        self.agents = []
+        self.agent_index = {}
+        self.goals = []
+        self.decay_function = self.exponential_decay
+        self.decay_factor = 0.8
+        self.last_millis = int(time.time() * 1000)
+        self.millis_passed = 0
+        self.debug = False
+        self.rules = AppraisalRules()
+        self.emotion_pad = {}
+        self.min_intensity = 0.0
+        self.min_like = 0.0
+        self.min_desirability = 0.0
+        self.belief_queue = None
+        self.history_settings = None
+        self.relation_graph = RelationGraph()
+        self.work_queue = None
+        self.work_sink = None
+        self.decay_profiles = {}
+        self.decay_agents = set()
+        self.decay_archetypes = set()
+        self.decay_cache = {}
+
+    '''
+    Method create_agent
+    A facilitator method that creates a new Agent and registers it for you
+    Params:
+    * agent_name: The agent with agentName is created
+    * archetype: The agent's archetype (e.g. 'villager', 'boss'), used to share decay profiles (see set_decay_profile) [optional].
+    return {Agent}: An agent reference to the newly created agent
+    '''
+    def create_agent(self, agent_name, archetype=None):
+        agent = Agent(agent_name, archetype)
+        self.register_agent(agent)
+        return agent
+
+    '''
+    method create_goal_for_agent
+    A facilitator method to create a goal for a particular agent, that also registers the goal to the agent and gamygdala.
+    This method is thus handy if you want to keep all gamygdala logic internal to Gamygdala.
+    However, if you want to do more sophisticated stuff (e.g., goals for multiple agents, keep track of your own list of goals to also remove them, appraise events per agent without the need for gamygdala to keep track of goals, etc...) this method will probably be doing too much.
+    Params:
+    * agent_name: The agent's name to which the newly created goal has to be added.
+    * goal_name: The goal's name.
+    * goal_utility: The goal's utility.
+    * is_maintenance_goal: Defines if the goal is a maintenance goal or not [optional]. The default is that the goal is an achievement goal, i.e., a goal that once it's likelihood reaches true (1) or false (-1) stays that way.
+    return {Goal} a goal reference to the newly created goal.
+    '''
+    def create_goal_for_agent(self, agent_name, goal_name, goal_utility, is_maintenance_goal=False):
+        temp_agent = self.get_agent_by_name(agent_name)
+        if temp_agent:
+            temp_goal = self.get_goal_by_name(goal_name)
+
+            if temp_goal:
+                print(f"Warning: I cannot make a new goal with the same name {goal_name} as one is registered already. I assume the goal is a common goal and will add the already known goal with that name to the agent {agent_name}")
+            else:
+                temp_goal = Goal(goal_name, goal_utility)
+                self.register_goal(temp_goal)
+
+            temp_agent.add_goal(temp_goal)
+
+            if is_maintenance_goal:
+                temp_goal.is_maintenance_goal = is_maintenance_goal
+            return temp_goal
+        else:
+            print(f"Error: agent with name {agent_name} does not exist, so I cannot create a goal for it.")
+            return None
+
+    '''
+    method create_relation
+    A facilitator method to create a relation between two agents. Both source and target have to exist and be registered with this Gamygdala instance.
+    This method is thus handy if you want to keep all gamygdala logic internal to Gamygdala.
+    Params:
+    * source_name: The agent who has the relation (the source)
+    * target_name: The agent who is the target of the relation (the target)
+    * relation: The relation (between -1 and 1).
+    In bounded mode (see set_budget), the pending appraisal work is completed first, as it depends on the relations.
+    '''
+    def create_relation(self, source_name, target_name, relation):
+        source = self.get_agent_by_name(source_name)
+        target = self.get_agent_by_name(target_name)
+        if source and target and -1 <= relation <= 1:
+            if self.work_queue is not None:
+                self.work_queue.process()
+            source.update_relation(target_name, relation)
+        else:
+            print(f'Error: cannot relate {source} to {target} with intensity {relation}')
+
+    '''
+    method appraise_belief
+    A facilitator method to appraise an event. It takes in the same as what the new Belief(...) takes in, creates a belief and appraises it for all agents that are registered.
+    This method is thus handy if you want to keep all gamygdala logic internal to Gamygdala.
+    Params:
+    * likelihood: The likelihood of this belief to be true.
+    * causal_agent_name: The agent's name of the causal agent of this belief.
+    * affected_goal_names: An array of affected goals' names.
+    * goal_congruences: An array of the affected goals' congruences (i.e., the extend to which this event is good or bad for a goal [-1,1]).
+    * is_incremental: Incremental evidence enforces gamygdala to see this event as incremental evidence for (or against) the list of goals provided, i.e, it will add or subtract this belief's likelihood*congruence from the goal likelihood instead of using the belief as "state" defining the absolute likelihood
+    In deferred mode (see set_deferred), the belief is queued and only appraised at the next flush().
+    '''
+    def appraise_belief(self, likelihood, causal_agent_name, affected_goal_names, goal_congruences, is_incremental=False):
+        temp_belief = Belief(likelihood, causal_agent_name, affected_goal_names, goal_congruences, is_incremental)
+        #self.appraise(temp_belief)
+        if self.belief_queue is not None:
+            self.belief_queue.enqueue(temp_belief)
+        else:
+            self.appraise_all(temp_belief)
+
+    '''
+    method set_deferred
+    Enables or disables the deferred mode. In deferred mode, appraise_belief queues the beliefs instead of appraising them,
+    and flush() (typically called once per frame) appraises them, coalescing redundant updates of the same goal (see BeliefQueue).
+    Disabling the deferred mode flushes the pending beliefs.
+    Param:
+    * deferred: True to queue beliefs until flush(), False to appraise them immediately.
+    '''
+    def set_deferred(self, deferred):
+        if deferred:
+            if self.belief_queue is None:
+                self.belief_queue = BeliefQueue(self)
+        elif self.belief_queue is not None:
+            self.flush()
+            self.belief_queue = None
+
+    '''
+    method flush
+    Appraises the beliefs queued in deferred mode.
+    return {int}: The number of appraisals performed (0 if not in deferred mode).
+    '''
+    def flush(self):
+        if self.belief_queue is None:
+            return 0
+        return self.belief_queue.flush()
+
+    '''
+    method set_budget
+    Enables or disables the bounded mode. In bounded mode, each appraisal updates the goal likelihoods, then processes the emotional
+    consequences in priority order (goal owners by |utility * delta likelihood|, then each emotion by its intensity) until the time budget is spent.
+    The remaining work is kept for later: call process_pending() (typically once per frame) until is_settled(), see WorkQueue.
+    Meanwhile decay_all does not decay the agents that the pending work may reach, they catch up with the missed decays when it is done.
+    Disabling the bounded mode completes the pending work. appraise_agent is not bounded.
+    Params:
+    * budget_ms: The time budget of each appraisal in milliseconds, None to disable the bounded mode.
+    * priority: An optional callable(agent, intensity) returning the priority of the work for an agent (higher first), e.g.:
+        em.set_budget(2, lambda agent, intensity: intensity / (1 + distance_to_player(agent.name)))
+    '''
+    def set_budget(self, budget_ms, priority=None):
+        if budget_ms is None:
+            if self.work_queue is not None:
+                self.work_queue.process()
+                self.work_queue = None
+        elif self.work_queue is None:
+            self.work_queue = WorkQueue(self, budget_ms, priority)
+        else:
+            self.work_queue.budget_ms = budget_ms
+            self.work_queue.priority = priority
+
+    '''
+    method process_pending
+    Processes the appraisal work left by the bounded mode (see set_budget).
+    Param:
+    * budget_ms: The time budget in milliseconds, None to complete all pending work.
+    return {bool}: True if no work is pending anymore.
+    '''
+    def process_pending(self, budget_ms=None):
+        if self.work_queue is None:
+            return True
+        self.work_queue.process(budget_ms)
+        return len(self.work_queue) == 0
+
+    def is_settled(self):
+        return self.work_queue is None or len(self.work_queue) == 0
+
+    '''
+    method fork
+    Creates a copy-on-write fork of the world, to evaluate beliefs without changing it (see WorldFork), e.g.:
+        what_if = em.fork()
+        what_if.appraise_belief(1.0, 'Player', ['village destroyed'], [1.0])
+        what_if.pad_deltas()
+    return {WorldFork}: The fork, to drop once evaluated.
+    '''
+    def fork(self):
+        from fork import WorldFork
+        return WorldFork(self)
+
+    '''
+    method print_all_emotions
+    Facilitator method to print all emotional states to the console.	
+    Param:
+    * gain: Whether you want to print the gained (true) emotional states or non-gained (false).
+    '''
+    def print_all_emotions(self, gain):
+        for agent in self.agents:
+            agent.print_emotional_state(gain)
+            agent.print_relations(None)
+
+    '''
+    method set_gain
+    Facilitator to set the gain for the whole set of agents known to Gamygdala.
+    For more realistic, complex games, you would typically set the gain for each agent type separately, to finetune the intensity of the response.
+    Param:
+    * gain: The gain value [0 and 20].
+    '''
+    def set_gain(self, gain):
+        for agent in self.agents:
+            agent.set_gain(gain)
+
+    '''
+    method set_decay
+    Sets the decay factor and function for emotional decay.
+    It sets the decay factor and type for emotional decay, so that an emotion will slowly get lower in intensity.
+    Whenever decayAll is called, all emotions for all agents are decayed according to the factor and function set here.
+    Params:
+    * decay_factor: The decay factor used. A factor of 1 means no decay, a factor 
+    * decay_function: The decay function to be used. Choose between linearDecay or exponentialDecay (see the corresponding methods)
+    See set_decay_profile for different decays per emotion, agent or archetype.
+    '''
+    def set_decay(self, decay_factor, decay_function):
+        self.decay_function = decay_function
+        self.decay_factor = decay_factor
+        self.decay_cache = {}
+
+    '''
+    method set_decay_profile
+    Sets the decay factor and function of one emotion, one agent or one archetype (see create_agent), or of one emotion for one agent or archetype,
+    e.g. anger lingering longer than joy, and bosses calming down slower than villagers:
+        em.set_decay_profile(0.95, em.exponential_decay, emotion_name='anger')
+        em.set_decay_profile(0.9, em.exponential_decay, archetype='boss')
+    Each emotion of an agent decays with the most specific profile, in this order: agent and emotion, agent, archetype and emotion, archetype,
+    emotion, and finally the decay set by set_decay. The emotions an agent feels for its relations decay like its internal emotions.
+    With linear_decay and exponential_decay, the decay of each profile is computed once per decay step (see decay_rates),
+    other decay functions are called for each value, as with set_decay.
+    Params:
+    * decay_factor: The decay factor of the profile, None to remove the profile.
+    * decay_function: The decay function of the profile (see set_decay).
+    * emotion_name: The emotion the profile applies to (None for all emotions).
+    * agent_name: The agent the profile applies to (None for all agents).
+    * archetype: The archetype the profile applies to (None for all agents), not together with agent_name.
+    '''
+    def set_decay_profile(self, decay_factor, decay_function=None, emotion_name=None, agent_name=None, archetype=None):
+        if agent_name is not None and archetype is not None:
+            print('Error: a decay profile applies either to an agent or to an archetype, not both')
+            return
+        if emotion_name is None and agent_name is None and archetype is None:
+            if decay_factor is not None:
+                self.set_decay(decay_factor, decay_function)
+            return
+
+        key = (agent_name, archetype, emotion_name)
+        if decay_factor is None:
+            self.decay_profiles.pop(key, None)
+        else:
+            self.decay_profiles[key] = (decay_factor, decay_function if decay_function is not None else self.decay_function)
+        self.decay_agents = {name for name, _, _ in self.decay_profiles if name is not None}
+        self.decay_archetypes = {archetype for _, archetype, _ in self.decay_profiles if archetype is not None}
+        self.decay_cache = {}
+
+    '''
+    method set_precision
+    Sets the precision policy of the appraisal, to cull emotional contributions too small to ever be perceived.
+    This is mainly useful for dense social graphs, where most of the social fan-out produces negligible intensities.
+    The default (all 0) records every nonzero emotion.
+    Params:
+    * min_intensity: Emotions with an intensity below or equal to this value are not recorded, and decayed emotions below it are removed (the decay always removes emotions below 0.001).
+    * min_like: Agents whose relation with the goal owner has an absolute like below this value are skipped by the social appraisal (no social emotions nor agent actions).
+    * min_desirability: Goals whose |utility * delta likelihood| is below this value are not appraised further once their likelihood is updated.
+    '''
+    def set_precision(self, min_intensity=0.0, min_like=0.0, min_desirability=0.0):
+        self.min_intensity = min_intensity
+        self.min_like = min_like
+        self.min_desirability = min_desirability
+
+    '''
+    method register_emotion
+    Registers the PAD (pleasure, arousal, dominance) mapping of an emotion that is not part of the default Gamygdala emotions,
+    for all agents known to Gamygdala and the ones registered later. Use this together with the appraisal rules tables, e.g.:
+        em.register_emotion('pride', [0.4, 0.3, 0.3])
+        em.rules.add_action_rule('pride', SELF_SELF, POSITIVE)
+    Params:
+    * emotion_name: The emotion's name.
+    * pad: The [pleasure, arousal, dominance] values of the emotion.
+    '''
+    def register_emotion(self, emotion_name, pad):
+        self.emotion_pad[emotion_name] = list(pad)
+        for agent in self.agents:
+            agent.map_pad[emotion_name] = list(pad)
+
+    '''
+    method enable_history
+    Gives all agents (current and future ones) a bounded history of their emotion intensities and PAD state, sampled by decay_all (see EmotionHistory).
+    The history of an agent is then available as agent.history, e.g. agent.history.series('fear', 30) for the last 30 seconds of fear.
+    The recorded emotions are the ones known to the agent's PAD map at the time the history is created.
+    Params:
+    * capacity: The number of samples per buffer.
+    * interval_ms: The minimum time between two samples in milliseconds.
+    * levels: The number of buffers, each one factor times coarser than the previous one.
+    * factor: The number of samples averaged into one sample of the next buffer.
+    '''
+    def enable_history(self, capacity=256, interval_ms=100, levels=3, factor=4):
+        self.history_settings = (capacity, interval_ms, levels, factor)
+        for agent in self.agents:
+            agent.history = EmotionHistory(agent.map_pad.keys(), *self.history_settings)
+
+    def disable_history(self):
+        self.history_settings = None
+        for agent in self.agents:
+            agent.history = None
+
+    '''
+    This starts the actual gamygdala decay process. It simply calls decayAll() at the specified interval.
+    The time_ms only defines the interval at which to decay, not the rate over time, that is defined by the decay_factor and function.
+    For more complex games (e.g., games where agents are not active when far away from the player, or games that do not need all agents to decay all the time) you should yourself choose when to decay agents individually.
+    To do so you can simply call the agent.decay() method (see the agent class).
+    Param:
+    * time_ms: The "framerate" of the decay in milliseconds. 
+    '''
+    def start_decay(self, time_ms):
+        import threading
+        threading.Timer(time_ms / 1000, self.decay_all).start()
+
+    '''
+    ///////////////////////////////////////////////////////////////////////
+    //Below this is more detailed gamygdala stuff to use it more flexibly.
+    ///////////////////////////////////////////////////////////////////////
+    '''
+    def register_agent(self, agent):
+        self.agents.append(agent)
+        self.agent_index[agent.name] = agent
+        agent.gamygdala_instance = self
+        self.relation_graph.invalidate()
+        for emotion_name, pad in self.emotion_pad.items():
+            agent.map_pad[emotion_name] = list(pad)
+        if self.history_settings is not None and agent.history is None:
+            agent.history = EmotionHistory(agent.map_pad.keys(), *self.history_settings)
+
+    def unregister_agent(self, agent):
+        self.agents.remove(agent)
+        if self.agent_index.get(agent.name) is agent:
+            del self.agent_index[agent.name]
+        agent.gamygdala_instance = None
+        self.relation_graph.invalidate()
+
+    def get_agent_by_name(self, agent_name):
+        agent = self.agent_index.get(agent_name)
+        if agent is not None:
+            return agent
+        # fall back on the list, for agents added to self.agents without register_agent
+        for agent in self.agents:
+            if agent.name == agent_name:
+                return agent
+        print(f'Warning: agent {agent_name} not found')
+        return None
+
+    def register_goal(self, goal):
+        # TO CHECK: get_goal_by_name already checked?
+        if self.get_goal_by_name(goal.name) is None:
+            self.goals.append(goal)
+        else:
+            print(f"Warning: failed adding a second goal with the same name: {goal.name}")
+
+    def unregister_goal(self, goal):
+        self.goals.remove(goal)
+
+    def get_goal_by_name(self, goal_name):
+        for goal in self.goals:
+            if goal.name == goal_name:
+                return goal
+        return None
+
+    '''
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    Appraise
+    These methods is the main emotional interpretation logic entry point. It performs the complete appraisal of a single event (belief) for all agents (appraise_all) or for only one agent (appraise_agent)
+    this is sometimes needed for efficiency, if you as a game developer know that particular agents can never appraise an event, then you can force Gamygdala to only look at a subset of agents.
+    Gamygdala assumes that the affected_agent is indeed the only goal owner affected, that the belief is well-formed, and will not perform any checks, nor use Gamygdala's list of known goals to find other agents that share this goal (!!!)
+    Params:
+    * belief: The current event, in the form of a Belief object, to be appraised
+    * affected_agent: The reference to the agent who needs to appraise the event. If given, this is the appraisal perspective (see explanation above).
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    '''
+
+    '''
+    Appraise a specific agent
+    '''
+    def appraise_agent(self, belief, affected_agent):
+        # check only affected_agent (which can be much faster) and does not involve console output nor checks
+        for i, goal_name in enumerate(belief.affected_goal_names):
+            # Loop through every goal in the list of affected goals by this event.
+            current_goal = affected_agent.get_goal_by_name(goal_name)
+            utility = current_goal.utility
+            delta_likelihood = self.calculate_delta_likelihood(current_goal, belief.goal_congruences[i], belief.likelihood, belief.is_incremental)
+            desirability = delta_likelihood * utility
+
+            if abs(desirability) < self.min_desirability:
+                # negligible change, the goal likelihood is updated but nobody will feel it
+                continue
+
+            # assume affected_agent is the only owner to be considered in this appraisal round.
+            owner = affected_agent
+
+            self.evaluate_internal_emotion(utility, delta_likelihood, current_goal.likelihood, owner)
+            self.agent_actions(owner.name, belief.causal_agent_name, owner.name, desirability, utility, delta_likelihood)
+
+            # now check if anyone has a relation to this goal owner, and update the social emotions accordingly.
+            self.propagate_social(owner, belief.causal_agent_name, utility, desirability, delta_likelihood)
+
+    '''
+    Appraise all agents
+    '''
+    def appraise_all(self, belief):
+        # check all
+        start_time = time.perf_counter()
+        if self.debug:
+            print(belief)
+
+        if len(belief.goal_congruences) != len(belief.affected_goal_names):
+            print("Error: the congruence list was not of the same length as the affected goal list")
+            print(belief.goal_congruences)
+            print(belief.affected_goal_names)
+            return False  # The congruence list must be of the same length as the affected goals list.
+
+        if len(self.goals) == 0:
+            print("Warning: no goals registered to Gamygdala, all goals to be considered in appraisal need to be registered.")
+            return False  # No goals registered to GAMYGDALA.
+
+        # Loop through every goal in the list of affected goals by this event.
+        for i, goal_name in enumerate(belief.affected_goal_names):
+            current_goal = self.get_goal_by_name(goal_name)
+
+            if current_goal is not None:
+                # the goal exists, appraise it
+                utility = current_goal.utility
+                delta_likelihood = self.calculate_delta_likelihood(current_goal, belief.goal_congruences[i], belief.likelihood, belief.is_incremental)
+                desirability = delta_likelihood * utility
+
+                if self.debug:
+                    print(f"Desirability = {desirability:.2f}")
+
+                if abs(desirability) < self.min_desirability:
+                    # negligible change, the goal likelihood is updated but nobody will feel it
+                    continue
+
+                # now find the owners, and update their emotional states
+                if self.work_queue is not None:
+                    # bounded mode, the emotional consequences are processed in priority order below
+                    for owner in self.agents:
+                        self.work_queue.push_owner(owner, belief.causal_agent_name, utility, desirability, delta_likelihood, current_goal.likelihood, owner.has_goal(current_goal.name))
+                    continue
+
+                for owner in self.agents:
+                    #if agent.has_goal(current_goal.name):
+                    #    owner = agent
+
+                    # Fix 10/10/2024 : evaluate emotions only if agent has a goal 
+                    if owner.has_goal(current_goal.name):
+                        if self.debug:
+                            print(f'....owned by {owner.name}')
+                        self.evaluate_internal_emotion(utility, delta_likelihood, current_goal.likelihood, owner)
+                        self.agent_actions(owner.name, belief.causal_agent_name, owner.name, desirability, utility, delta_likelihood)
+
+                    # now check if anyone has a relation to this goal owner, and update the social emotions accordingly.
+                    self.propagate_social(owner, belief.causal_agent_name, utility, desirability, delta_likelihood)
+
+        if self.work_queue is not None:
+            self.work_queue.process(max(0.0, self.work_queue.budget_ms - (time.perf_counter() - start_time) * 1000))
+
+        # print the emotions to the console for debugging
+        if self.debug:
+            self.print_all_emotions(True)
+
+    '''
+    Social propagation
+    Updates the social emotions of all agents that have a relation with the goal owner, i.e., the owner's in-edges in the relation graph,
+    and the agent actions (remorse, gratification) of the causal agent if it is one of them.
+    With the default social rules, the intensities of all observers are computed in one pass: intensity = |utility * delta_likelihood * like|,
+    and the emotion is chosen by the signs of the desirability and the like.
+    '''
+    def propagate_social(self, owner, causal_agent_name, utility, desirability, delta_likelihood):
+        graph = self.relation_graph.update(self.agents)
+        start, end = graph.in_edges(owner.name)
+        added = graph.added_in_edges(owner.name)
+        if start == end and not added:
+            return
+
+        observers = graph.observers
+        relations = graph.relations
+
+        if self.debug or not self.rules.vectorized_social:
+            for observer, relation in itertools.chain(((observers[k], relations[k]) for k in range(start, end)), added):
+                if abs(relation.like) >= self.min_like:
+                    if self.debug:
+                        print(f'{observer.name} has a relationship with {owner.name}')
+                        print(relation)
+
+                    # The agent has relationship with the goal owner which has nonzero utility, add relational effects to the relations for agent[k].
+                    self.evaluate_social_emotion(utility, desirability, delta_likelihood, relation, observer)
+
+                    # also add remorse and gratification if conditions are met within (i.e., agent[k] did something bad/good for owner)
+                    self.agent_actions(owner.name, causal_agent_name, observer.name, desirability, utility, delta_likelihood)
+            return
+
+        social = self.rules.social
+        desirability_sign = POSITIVE if desirability >= 0 else NEGATIVE
+        likes = graph.likes
+        sink = self.work_sink
+        base = abs(utility * delta_likelihood)
+        edges = [(observers[k], relations[k], likes[k], emotion_intensity)
+                 for k, emotion_intensity in graph.social_intensities(start, end, base, self.min_like, self.min_intensity)]
+        for observer, relation in added:
+            # the relations added since the last rebuild, see RelationGraph.add_relation
+            like = relation.like
+            if abs(like) >= self.min_like and base * abs(like) > self.min_intensity:
+                edges.append((observer, relation, like, base * abs(like)))
+        for observer, relation, like, emotion_intensity in edges:
+            for emotion_name, _ in social[AppraisalRules.social_index(desirability_sign, POSITIVE if like >= 0 else NEGATIVE)]:
+                if sink is not None:
+                    sink.add(observer, relation, emotion_name, emotion_intensity)
+                    continue
+                relation.add_intensity(emotion_name, emotion_intensity)
+                observer.add_intensity(emotion_name, emotion_intensity)  # also add relation emotion to the emotional state
+
+        # agent actions only concern observers that are the causal agent (or the owner itself), see agent_actions
+        for observer_name in (causal_agent_name, owner.name) if causal_agent_name != owner.name else (owner.name,):
+            observer = self.agent_index.get(observer_name)
+            if observer is not None:
+                relation = observer.get_relation(owner.name)
+                if relation is not None and abs(relation.like) >= self.min_like:
+                    self.agent_actions(owner.name, causal_agent_name, observer_name, desirability, utility, delta_likelihood)
+
+    def calculate_delta_likelihood(self, goal, congruence, belief_likelihood, is_incremental):
+        # Defines the change in a goal's likelihood due to the congruence and likelihood of a current event.
+        # We cope with two types of beliefs: incremental and absolute beliefs. Incrementals have their likelihood added to the goal, absolute define the current likelihood of the goal
+        # And two types of goals: maintenance and achievement. If an achievement goal (the default) is -1 or 1, we can't change it any more (unless externally and explicitly by changing the goal.likelihood).
+        old_likelihood = goal.likelihood
+        new_likelihood = None
+
+        # Added bug Fix : if not goal.is_maintenance_goal and (old_likelihood >= 1 or old_likelihood <= -1):
+        if not goal.is_maintenance_goal and old_likelihood is not None and (old_likelihood >= 1 or old_likelihood <= 0):
+            return 0
+
+        if hasattr(goal, 'calculate_likelihood') and callable(goal.calculate_likelihood):
+            # If the goal has an associated function to calculate the likelihood that the goal is true, then use that function
+            new_likelihood = goal.calculate_likelihood()
+        else:
+            # Otherwise use the event encoded updates
+            # Added bug Fix : check for old_likelihood is Not None
+            if is_incremental and old_likelihood is not None:
+                new_likelihood = old_likelihood + belief_likelihood * congruence
+                # Added Joost fix 07/10/2024 : new_likelihood = max(min(new_likelihood, 1), -1)
+                new_likelihood = max(min(new_likelihood, 1), 0)
+            else:
+                new_likelihood = (congruence * belief_likelihood + 1.0) / 2.0
+
+        goal.likelihood = new_likelihood
+        if self.debug:
+            print(f"Updated Goal likelihood = {new_likelihood:.2f}")
+
+        if old_likelihood is not None:
+            if self.debug:
+                print(f"Goal Delta likelihood = {new_likelihood - old_likelihood:.2f}")
+            return new_likelihood - old_likelihood
+        else:
+            if self.debug:
+                print(f"Goal likelihood: new = {new_likelihood:.2f}")
+            return new_likelihood
+    
+    '''
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    Internal Consequence of Events
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    '''
+    def evaluate_internal_emotion(self, utility, delta_likelihood, goal_likelihood, agent):
+        # This method evaluates the event in terms of internal emotions that do not need relations to exist, such as hope, fear, etc.
+        # The emotions are looked up in the internal rules table (see AppraisalRules).
+        base = abs(utility * delta_likelihood)
+
+        if self.debug:
+            print(f"Internal emotion intensity = {base:.2f}")
+
+        if base == 0:
+            return
+
+        if 0 < goal_likelihood < 1:
+            state = UNCERTAIN
+        elif goal_likelihood == 1:
+            state = CONFIRMED
+        elif goal_likelihood == 0:
+            state = DISCONFIRMED
+        else:
+            return
+
+        rules = self.rules.internal[AppraisalRules.internal_index(POSITIVE if utility >= 0 else NEGATIVE, state, delta_class(delta_likelihood))]
+        for emotion_name, formula in rules:
+            emotion_intensity = base if formula == INTENSITY_UTILITY_DELTA else intensity(formula, base, utility, delta_likelihood, 0)
+            if emotion_intensity > self.min_intensity:
+                if self.work_sink is None:
+                    agent.add_intensity(emotion_name, emotion_intensity)
+                else:
+                    self.work_sink.add(agent, None, emotion_name, emotion_intensity)
+
+    '''
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    Social Consequence of Events
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    '''
+    def evaluate_social_emotion(self, utility, desirability, delta_likelihood, relation, agent):
+        # This function is used to evaluate happy-for, pity, gloating or resentment.
+        # Emotions that arise when we evaluate events that affect goals of others.
+        # The desirability is the desirability from the goal owner's perspective.
+        # The agent is the agent getting evaluated (the agent that gets the social emotion added to his emotional state).
+        # The relation is a relation object between the agent being evaluated and the goal owner of the affected goal.
+
+        if self.debug:
+            print(f"Social Emotion: Desirability = {desirability:.2f}, Relation.like = {relation.like:.2f}")
+
+        like = relation.like
+        rules = self.rules.social[AppraisalRules.social_index(POSITIVE if desirability >= 0 else NEGATIVE, POSITIVE if like >= 0 else NEGATIVE)]
+        for emotion_name, formula in rules:
+            if formula == INTENSITY_UTILITY_DELTA_LIKE:
+                emotion_intensity = abs(utility * delta_likelihood * like)
+            else:
+                emotion_intensity = intensity(formula, abs(utility * delta_likelihood), utility, delta_likelihood, like)
+
+            if self.debug:
+                print(f"Social emotion intensity = {emotion_intensity:.2f}")
+
+            if emotion_intensity > self.min_intensity:
+                if self.work_sink is not None:
+                    self.work_sink.add(agent, relation, emotion_name, emotion_intensity)
+                    continue
+                relation.add_intensity(emotion_name, emotion_intensity)
+                agent.add_intensity(emotion_name, emotion_intensity)  # also add relation emotion to the emotional state
+
+    '''
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    Actions of Agents
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    '''
+    def agent_actions(self, affected_name, causal_name, self_name, desirability, utility, delta_likelihood):
+        if causal_name is None or causal_name == '':
+            # If the causal agent is null or empty, then we assume the event was not caused by an agent.
+            return
+
+        # There are three cases here (see the action rules in AppraisalRules):
+        # 1. The affected agent is SELF and causal agent is other.
+        # 2. The affected agent is SELF and causal agent is SELF (e.g. pride and shame, no default rules).
+        # 3. The affected agent is OTHER and causal agent is SELF.
+        # The action table is indexed by role, desirability sign and like sign (see AppraisalRules.action_index).
+        desirability_sign = POSITIVE if desirability >= 0 else NEGATIVE
+        new_relation_name = None
+
+        if affected_name == self_name:
+            if self_name != causal_name:
+                # Case one : SELF-OTHER, the relation with the causal agent is created if an emotion is recorded
+                self_agent = self.get_agent_by_name(self_name)
+                relation = self_agent.get_relation(causal_name)
+                like = 0.0 if relation is None else relation.like
+                rules = self.rules.actions[AppraisalRules.action_index(SELF_OTHER, desirability_sign, POSITIVE if like >= 0 else NEGATIVE)]
+                if relation is None:
+                    new_relation_name = causal_name
+            else:
+                # Case two : SELF-SELF, no relation involved
+                rules = self.rules.actions[AppraisalRules.action_index(SELF_SELF, desirability_sign, POSITIVE)]
+                if not rules:
+                    return
+                self_agent = self.get_agent_by_name(self_name)
+                relation = None
+                like = 0.0
+
+        elif causal_name == self_name:
+            # Case three : OTHER-SELF, only if the causal agent has a relation with the affected agent
+            self_agent = self.get_agent_by_name(causal_name)
+            relation = self_agent.get_relation(affected_name)
+            if relation is None:
+                return
+            like = relation.like
+            rules = self.rules.actions[AppraisalRules.action_index(OTHER_SELF, desirability_sign, POSITIVE if like >= 0 else NEGATIVE)]
+
+        else:
+            return
+
+        base = abs(utility * delta_likelihood)
+        for emotion_name, formula in rules:
+            emotion_intensity = base if formula == INTENSITY_UTILITY_DELTA else intensity(formula, base, utility, delta_likelihood, like)
+            if emotion_intensity <= self.min_intensity:
+                continue
+            if new_relation_name is not None:
+                self_agent.update_relation(new_relation_name, like)
+                relation = self_agent.get_relation(new_relation_name)
+                new_relation_name = None
+            if self.work_sink is not None:
+                self.work_sink.add(self_agent, relation, emotion_name, emotion_intensity)
+                continue
+            if relation is not None:
+                relation.add_intensity(emotion_name, emotion_intensity)
+            self_agent.add_intensity(emotion_name, emotion_intensity)  # also add relation emotion to the emotional state
+
+    '''
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    Decay methods
+    //////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
+    '''
+    def decay_all(self, millis_passed=None):
+        # Decays all agents for the time passed since the last call (wall clock), or for millis_passed when given (simulated time).
+        if millis_passed is None:
+            now = int(time.time() * 1000)
+            self.millis_passed = now - self.last_millis
+            self.last_millis = now
+        else:
+            self.millis_passed = millis_passed
+            self.last_millis += millis_passed
+        self.decay_cache = {}
+        held = self.work_queue.decay(self.millis_passed) if self.work_queue is not None else None
+        for agent in self.agents:
+            if not held or agent not in held:
+                agent.decay(self)
+            if agent.history is not None:
+                agent.history.sample(agent, self.last_millis)
+
+    '''
+    method decay_rates
+    Returns the decay of an agent's emotions for the current decay step (millis_passed), see set_decay_profile.
+    The rates are computed once per step for all agents that share the same profiles.
+    Param:
+    * agent: The agent, or None for the agents without agent or archetype profiles.
+    return {tuple}: (default, by_emotion), the rate of the emotions that are not in the by_emotion dict, and the rates by emotion name.
+    A rate (multiplier, offset, function) decays a value to value * multiplier - offset, or to function(value) if the function is not None.
+    '''
+    def decay_rates(self, agent):
+        agent_name = archetype = None
+        if agent is not None:
+            if agent.name in self.decay_agents:
+                agent_name = agent.name
+            if agent.archetype in self.decay_archetypes:
+                archetype = agent.archetype
+        key = (self.millis_passed, agent_name, archetype)
+        rates = self.decay_cache.get(key)
+        if rates is None:
+            rates = self.decay_cache[key] = self.resolve_decay_rates(agent_name, archetype)
+        return rates
+
+    def resolve_decay_rates(self, agent_name, archetype):
+        profiles = self.decay_profiles
+        # the profiles from the most to the least specific, for all emotions (None) and for each emotion
+        scopes = []
+        if agent_name is not None:
+            scopes.append((agent_name, None))
+        if archetype is not None:
+            scopes.append((None, archetype))
+
+        default = (self.decay_factor, self.decay_function)
+        for scope in scopes:
+            if scope + (None,) in profiles:
+                default = profiles[scope + (None,)]
+                break
+
+        by_emotion = {}
+        emotion_names = {key[2] for key in profiles if key[2] is not None and (key[:2] in scopes or key[:2] == (None, None))}
+        for emotion_name in emotion_names:
+            for scope in scopes:
+                if scope + (emotion_name,) in profiles:
+                    by_emotion[emotion_name] = profiles[scope + (emotion_name,)]
+                    break
+                if scope + (None,) in profiles:
+                    by_emotion[emotion_name] = profiles[scope + (None,)]
+                    break
+            else:
+                if (None, None, emotion_name) in profiles:
+                    by_emotion[emotion_name] = profiles[(None, None, emotion_name)]
+
+        rates = {}
+        def rate(profile):
+            if profile not in rates:
+                rates[profile] = self.decay_rate(*profile)
+            return rates[profile]
+        return rate(default), {emotion_name: rate(profile) for emotion_name, profile in by_emotion.items()}
+
+    def decay_rate(self, decay_factor, decay_function):
+        # linear and exponential decays are the same for all values of a step, other functions are called for each value
+        function = getattr(decay_function, '__func__', None)
+        if function is Gamygdala.exponential_decay:
+            return math.pow(decay_factor, self.millis_passed / 1000), 0.0, None
+        if function is Gamygdala.linear_decay:
+            return 1.0, decay_factor * (self.millis_passed / 1000), None
+        return 1.0, 0.0, decay_function
+
+    def linear_decay(self, value):
+        return value - self.decay_factor * (self.millis_passed / 1000)
+
+    def exponential_decay(self, value):
         return value * math.pow(self.decay_factor, self.millis_passed / 1000)
\ No newline at end of file
@@ -1,133 +1,511 @@
-import unittest
-import math
-import time
-from gamygdala import Gamygdala
-
-class TestEmotionEngine(unittest.TestCase):
-
-    def assert_emotion(self, agent, name, intensity=0.7, is_in=True):
-        self.assertEqual(any(emo.name == name and emo.intensity >= intensity for emo in agent.internal_state), is_in)
-
-    def assert_relation(self, agent, name, intensity):
-        emotions = [emotion for relation in agent.current_relations for emotion in relation.emotion_list]
-        self.assertTrue(any(emo.name == name and emo.intensity >= intensity for emo in emotions))
-
-    def assert_pad(self, agent, use_gain=False):
-        pad = agent.get_pad_state(use_gain)
-        temp = self.get_temperament(pad)
-        assert temp != 'Unknown', f"Temperament for {agent.name} is Unknown"        
-        print(f"{agent.name} is {temp.upper()} ; (PAD state = {','.join(f'{p:.2f}' for p in pad[:3])})")
-
-    def get_temperament(self, pad):
-        sign = lambda x: math.copysign(1, x)
-        sign_P, sign_A, sign_D = map(sign, pad[:3])
-        temperament_map = {
-            (1, 1, 1): 'Exuberant',
-            (1, 1, -1): 'Dependent',
-            (-1, -1, 1): 'Disdainful',
-            (-1, -1, -1): 'Bored',
-            (1, -1, 1): 'Relaxed',
-            (1, -1, -1): 'Docile',
-            (-1, 1, 1): 'Hostile',
-            (-1, 1, -1): 'Anxious'
-        }
-        return temperament_map.get((sign_P, sign_A, sign_D), 'Unknown')
-
-    def do_something(self, em, secs, decay=0.1):
-        print(f"\nProcessing decay for {secs}s...")
-        start_time = time.time()
-        end_time = start_time + secs
-        decay_ms = decay * 1000
-        while time.time() < end_time:
-            em.start_decay(decay_ms)  # decay every decay_ms
-            time.sleep(decay)
-
-    '''
-    Test 1 : test internal emotions.
-    '''
-    def test_1_rpg_relief(self):
-        print("\nTEST 1: A villager fears his village will be destroyed, then feels relief when he realises this will not gonna happen.")
-
-        em = Gamygdala()
-        em.debug = True
-
-        agent = em.create_agent('Villager')
-
-        # Goal creation: agent do not want the village to be destroyed 
-        # Goal utility: the value the NPC attributes to this goal becoming True ([-1,1]) where a negative value means the NPC does not want this to happen.
-        goal = em.create_goal_for_agent(agent.name, 'village destroyed', -0.9)
-        self.assertIsNotNone(goal)
-
-        # Set decay for 2s
-        em.set_decay(0.1, em.exponential_decay)
-        #em.set_decay(0.1, em.linear_decay)
-
-        # Set gain
-        em.set_gain(5)
-
-        # Create first belief event
-        # Belief likelihood: the likelihood that this information is true ([0, 1]) where 0 means the belief is disconfirmed and 1 means it is confirmed.
-        # Congruence: a number ([-1,1]) where negative values mean this belief is blocking the goal and positive values means this belief facilitates the goal.
-        print()
-        em.appraise_belief(0.6, agent.name, [goal.name], [1.0])
-        self.assert_emotion(agent, 'fear')
-        self.assert_pad(agent, True)
-
-        # Decay emotion and test deletion (see below)
-        self.do_something(em, 3)
-
-        # Create second belief event
-        # Here the villager has the belief that the destruction of the village is not gonna to happen (Belief is set to 1 and Congruence to goal = -1, blocking the goal)
-        print()
-        em.appraise_belief(1.0, agent.name, [goal.name], [-1.0])
-        self.assert_emotion(agent, 'relief')
-        self.assert_emotion(agent, 'fear', 0, False)
-        self.assert_pad(agent, True)
-
-    '''
-    Test 2 : test social emotions.
-    '''
-    def test_2_rpg_pride(self):
-        print("\nTEST 2: The blacksmith was proud of saving the village by providing it with weapons.")
-
-        em = Gamygdala()
-        em.debug = True
-
-        village = em.create_agent('Village')
-        blacksmith = em.create_agent('Blacksmith')
-        em.create_relation(blacksmith.name, village.name, 1.0)
-
-        # Initial step: Blacksmith happy to live in village with gratitude
-        goal_live = em.create_goal_for_agent(blacksmith.name, 'to live', 0.7)
-        self.assertIsNotNone(goal_live)
-        em.set_decay(0.1, em.exponential_decay)
-        em.set_gain(5)
-        print()
-        em.appraise_belief(1.0, village.name, [goal_live.name], [1.0])
-        self.assert_emotion(blacksmith, 'gratitude')
-        self.assert_pad(blacksmith, True)
-        self.assert_relation(blacksmith, 'happy-for', 0.7)
-        self.assert_relation(blacksmith, 'gratitude', 0.7)
-
-        self.do_something(em, 3)
-
-        # Second step: brings the belief that the village is in great danger
-        goal_destroyed = em.create_goal_for_agent(blacksmith.name, 'village destroyed', -1.0)
-        self.assertIsNotNone(goal_destroyed)
-        print()
-        em.appraise_belief(0.7, blacksmith.name, [goal_destroyed.name], [1.0])
-        self.assert_emotion(blacksmith, 'pity')
-        self.assert_pad(blacksmith, True)
-        self.do_something(em, 3)
- 
-        # Third Step: Blacksmith is able to help the village providing weapons
-        print()
-        em.appraise_belief(1.0, blacksmith.name, [goal_destroyed.name], [-1.0])
-        self.assert_emotion(blacksmith, 'happy-for')
-        self.assert_emotion(blacksmith, 'gratification')
-        self.assert_pad(blacksmith, True)
-        self.assert_relation(blacksmith, 'happy-for', 0.8)
-        self.assert_relation(blacksmith, 'gratification', 0.8)
-
-if __name__ == "__main__":
+import unittest
+import math
+import random
+import time
+from gamygdala import Gamygdala
+from soak import generate_world
+from appraisal_rules import POSITIVE, NEGATIVE, SELF_SELF
+
+class TestEmotionEngine(unittest.TestCase):
+
+    def assert_emotion(self, agent, name, intensity=0.7, is_in=True):
+        self.assertEqual(any(emo.name == name and emo.intensity >= intensity for emo in agent.internal_state), is_in)
+
+    def assert_relation(self, agent, name, intensity):
+        emotions = [emotion for relation in agent.current_relations for emotion in relation.emotion_list]
+        self.assertTrue(any(emo.name == name and emo.intensity >= intensity for emo in emotions))
+
+    def assert_pad(self, agent, use_gain=False):
+        pad = agent.get_pad_state(use_gain)
+        temp = self.get_temperament(pad)
+        assert temp != 'Unknown', f"Temperament for {agent.name} is Unknown"        
+        print(f"{agent.name} is {temp.upper()} ; (PAD state = {','.join(f'{p:.2f}' for p in pad[:3])})")
+
+    def get_temperament(self, pad):
+        sign = lambda x: math.copysign(1, x)
+        sign_P, sign_A, sign_D = map(sign, pad[:3])
+        temperament_map = {
+            (1, 1, 1): 'Exuberant',
+            (1, 1, -1): 'Dependent',
+            (-1, -1, 1): 'Disdainful',
+            (-1, -1, -1): 'Bored',
+            (1, -1, 1): 'Relaxed',
+            (1, -1, -1): 'Docile',
+            (-1, 1, 1): 'Hostile',
+            (-1, 1, -1): 'Anxious'
+        }
+        return temperament_map.get((sign_P, sign_A, sign_D), 'Unknown')
+
+    def do_something(self, em, secs, decay=0.1):
+        print(f"\nProcessing decay for {secs}s...")
+        start_time = time.time()
+        end_time = start_time + secs
+        decay_ms = decay * 1000
+        while time.time() < end_time:
+            em.start_decay(decay_ms)  # decay every decay_ms
+            time.sleep(decay)
+
+    '''
+    Test 1 : test internal emotions.
+    '''
+    def test_1_rpg_relief(self):
+        print("\nTEST 1: A villager fears his village will be destroyed, then feels relief when he realises this will not gonna happen.")
+
+        em = Gamygdala()
+        em.debug = True
+
+        agent = em.create_agent('Villager')
+
+        # Goal creation: agent do not want the village to be destroyed 
+        # Goal utility: the value the NPC attributes to this goal becoming True ([-1,1]) where a negative value means the NPC does not want this to happen.
+        goal = em.create_goal_for_agent(agent.name, 'village destroyed', -0.9)
+        self.assertIsNotNone(goal)
+
+        # Set decay for 2s
+        em.set_decay(0.1, em.exponential_decay)
+        #em.set_decay(0.1, em.linear_decay)
+
+        # Set gain
+        em.set_gain(5)
+
+        # Create first belief event
+        # Belief likelihood: the likelihood that this information is true ([0, 1]) where 0 means the belief is disconfirmed and 1 means it is confirmed.
+        # Congruence: a number ([-1,1]) where negative values mean this belief is blocking the goal and positive values means this belief facilitates the goal.
+        print()
+        em.appraise_belief(0.6, agent.name, [goal.name], [1.0])
+        self.assert_emotion(agent, 'fear')
+        self.assert_pad(agent, True)
+
+        # Decay emotion and test deletion (see below)
+        self.do_something(em, 3)
+
+        # Create second belief event
+        # Here the villager has the belief that the destruction of the village is not gonna to happen (Belief is set to 1 and Congruence to goal = -1, blocking the goal)
+        print()
+        em.appraise_belief(1.0, agent.name, [goal.name], [-1.0])
+        self.assert_emotion(agent, 'relief')
+        self.assert_emotion(agent, 'fear', 0, False)
+        self.assert_pad(agent, True)
+
+    '''
+    Test 2 : test social emotions.
+    '''
+    def test_2_rpg_pride(self):
+        print("\nTEST 2: The blacksmith was proud of saving the village by providing it with weapons.")
+
+        em = Gamygdala()
+        em.debug = True
+
+        village = em.create_agent('Village')
+        blacksmith = em.create_agent('Blacksmith')
+        em.create_relation(blacksmith.name, village.name, 1.0)
+
+        # Initial step: Blacksmith happy to live in village with gratitude
+        goal_live = em.create_goal_for_agent(blacksmith.name, 'to live', 0.7)
+        self.assertIsNotNone(goal_live)
+        em.set_decay(0.1, em.exponential_decay)
+        em.set_gain(5)
+        print()
+        em.appraise_belief(1.0, village.name, [goal_live.name], [1.0])
+        self.assert_emotion(blacksmith, 'gratitude')
+        self.assert_pad(blacksmith, True)
+        self.assert_relation(blacksmith, 'happy-for', 0.7)
+        self.assert_relation(blacksmith, 'gratitude', 0.7)
+
+        self.do_something(em, 3)
+
+        # Second step: brings the belief that the village is in great danger
+        goal_destroyed = em.create_goal_for_agent(blacksmith.name, 'village destroyed', -1.0)
+        self.assertIsNotNone(goal_destroyed)
+        print()
+        em.appraise_belief(0.7, blacksmith.name, [goal_destroyed.name], [1.0])
+        self.assert_emotion(blacksmith, 'pity')
+        self.assert_pad(blacksmith, True)
+        self.do_something(em, 3)
+ 
+        # Third Step: Blacksmith is able to help the village providing weapons
+        print()
+        em.appraise_belief(1.0, blacksmith.name, [goal_destroyed.name], [-1.0])
+        self.assert_emotion(blacksmith, 'happy-for')
+        self.assert_emotion(blacksmith, 'gratification')
+        self.assert_pad(blacksmith, True)
+        self.assert_relation(blacksmith, 'happy-for', 0.8)
+        self.assert_relation(blacksmith, 'gratification', 0.8)
+
+    '''
+    Test 3 : test custom appraisal rules.
+    '''
+    def test_3_rpg_custom_rules(self):
+        print("\nTEST 3: The knight is proud of slaying the dragon by himself, and ashamed when he lets it escape.")
+
+        em = Gamygdala()
+
+        knight = em.create_agent('Knight')
+        goal = em.create_goal_for_agent(knight.name, 'dragon slain', 0.8, True)
+        self.assertIsNotNone(goal)
+
+        # SELF-SELF has no default rules: no emotion beside the internal ones
+        em.appraise_belief(1.0, knight.name, [goal.name], [1.0])
+        self.assert_emotion(knight, 'joy', 0.7)
+        self.assert_emotion(knight, 'pride', 0, False)
+
+        # Register pride and shame for the SELF-SELF case
+        em.register_emotion('pride', [0.4, 0.3, 0.3])
+        em.register_emotion('shame', [-0.3, 0.1, -0.6])
+        em.rules.add_action_rule('pride', SELF_SELF, POSITIVE)
+        em.rules.add_action_rule('shame', SELF_SELF, NEGATIVE)
+
+        em.appraise_belief(1.0, knight.name, [goal.name], [-1.0])
+        self.assert_emotion(knight, 'shame', 0.7)
+        self.assert_emotion(knight, 'pride', 0, False)
+        self.assert_pad(knight, True)
+        self.assertEqual(knight.current_relations, [])
+
+        # Agents created after the registration also know the PAD values of the new emotions
+        squire = em.create_agent('Squire')
+        self.assertIn('pride', squire.map_pad)
+
+    '''
+    Test 4 : test precision policy.
+    '''
+    def test_4_rpg_precision(self):
+        print("\nTEST 4: A stranger barely knows the merchant and does not care about his business, negligible emotions are culled.")
+
+        em = Gamygdala()
+        merchant = em.create_agent('Merchant')
+        stranger = em.create_agent('Stranger')
+        friend = em.create_agent('Friend')
+        em.create_relation(stranger.name, merchant.name, 0.01)
+        em.create_relation(friend.name, merchant.name, 0.8)
+        goal = em.create_goal_for_agent(merchant.name, 'good business', 0.5, True)
+
+        goal.likelihood = 0.5
+        em.set_precision(min_intensity=0.05, min_like=0.1, min_desirability=0.01)
+
+        # Barely noticeable change: goal updated, no emotions
+        em.appraise_belief(0.01, friend.name, [goal.name], [1.0])
+        self.assertAlmostEqual(goal.likelihood, 0.505)
+        em.appraise_belief(0.02, friend.name, [goal.name], [1.0], True)
+        self.assertAlmostEqual(goal.likelihood, 0.525)
+        self.assertEqual(merchant.internal_state, [])
+        self.assertEqual(friend.internal_state, [])
+        self.assertEqual(len(merchant.current_relations), 0)
+
+        # Real change: only the friend cares, and only emotions above the floor are recorded
+        em.appraise_belief(1.0, None, [goal.name], [1.0])
+        self.assert_emotion(merchant, 'joy', 0.2)
+        self.assert_emotion(friend, 'happy-for', 0.15)
+        self.assertEqual(stranger.internal_state, [])
+        self.assertEqual(stranger.get_relation(merchant.name).emotion_list, [])
+
+    '''
+    Test 5 : test deferred appraisal.
+    '''
+    def test_5_rpg_deferred(self):
+        print("\nTEST 5: The guard is pinged several times in the same frame that the castle is under attack.")
+
+        em = Gamygdala()
+        guard = em.create_agent('Guard')
+        orc = em.create_agent('Orc')
+        goal = em.create_goal_for_agent(guard.name, 'castle taken', -0.8, True)
+        goal.likelihood = 0.2
+
+        em.set_deferred(True)
+        em.appraise_belief(0.5, orc.name, [goal.name], [1.0])
+        em.appraise_belief(0.2, orc.name, [goal.name], [1.0])
+        em.appraise_belief(0.1, orc.name, [goal.name], [1.0], True)
+        em.appraise_belief(0.1, orc.name, [goal.name], [1.0], True)
+        em.appraise_belief(0.2, None, [goal.name], [-1.0], True)
+
+        # nothing is appraised before the flush
+        self.assertEqual(goal.likelihood, 0.2)
+        self.assertEqual(guard.internal_state, [])
+
+        # one appraisal for the orc run, one for the last belief
+        self.assertEqual(em.flush(), 2)
+        self.assertAlmostEqual(goal.likelihood, 0.6)
+        self.assert_emotion(guard, 'fear', 0.47)
+        self.assert_relation(guard, 'anger', 0.47)
+        self.assert_emotion(guard, 'hope', 0.15)
+        self.assertEqual(em.flush(), 0)
+
+        # leaving the deferred mode flushes the pending beliefs
+        em.appraise_belief(1.0, orc.name, [goal.name], [1.0])
+        em.set_deferred(False)
+        self.assertEqual(goal.likelihood, 1.0)
+        self.assert_emotion(guard, 'distress', 0.3)
+
+    '''
+    Test 6 : test emotion history.
+    '''
+    def test_6_rpg_history(self):
+        print("\nTEST 6: The designer looks at how the villager's fear trended while the dragon was approaching.")
+
+        em = Gamygdala()
+        em.enable_history(capacity=4, interval_ms=100, levels=2, factor=2)
+        villager = em.create_agent('Villager')
+        goal = em.create_goal_for_agent(villager.name, 'village destroyed', -1.0, True)
+        goal.likelihood = 0.0
+        history = villager.history
+        self.assertIsNotNone(history)
+
+        # The dragon gets closer every 100ms (sampled by hand, decay_all samples at the current time)
+        for step in range(10):
+            em.appraise_belief(0.1, None, [goal.name], [1.0], True)
+            self.assertTrue(history.sample(villager, step * 100))
+        self.assertFalse(history.sample(villager, 950))
+
+        # 4 recent samples, and the 6 older ones averaged by 2 in the coarser buffer
+        self.assertEqual(len(history), 7)
+        times, fear = history.series('fear')
+        self.assertEqual(times, [50, 250, 450, 600, 700, 800, 900])
+        for expected, value in zip([0.15, 0.35, 0.55, 0.7, 0.8, 0.9, 1.0], fear):
+            self.assertAlmostEqual(value, expected)
+        self.assertEqual(history.series('fear', 0.25)[0], [700, 800, 900])
+        self.assertLess(history.series('pleasure')[1][-1], 0)
+
+        # A sample evicted before its group is complete is still reported, as a partial average
+        history.sample(villager, 1000)
+        self.assertEqual(len(history), 8)
+        times, fear = history.series('fear')
+        self.assertEqual(times, [50, 250, 450, 600, 700, 800, 900, 1000])
+        self.assertEqual(history.series('fear', 0.45)[0], [600, 700, 800, 900, 1000])
+        times, rows = history.export()
+        self.assertEqual(list(times), [50, 250, 450, 600, 700, 800, 900, 1000])
+
+        # Memory does not grow
+        nbytes = history.nbytes
+        for step in range(11, 100):
+            history.sample(villager, step * 100)
+        self.assertEqual(len(history), 8)
+        self.assertEqual(history.nbytes, nbytes)
+        times, rows = history.export()
+        self.assertEqual(len(rows), len(times) * len(history.channels))
+
+        # decay_all samples every agent
+        em.decay_all()
+        self.assertEqual(history.last_sample, em.last_millis)
+
+    '''
+    Test 7 : test social propagation over the relation graph.
+    '''
+    def test_7_rpg_faction(self):
+        print("\nTEST 7: The king wins a battle, his faction is happy for him and the rebels resent it.")
+
+        em = Gamygdala()
+        king = em.create_agent('King')
+        knights = [em.create_agent(f'Knight{i}') for i in range(40)]
+        rebels = [em.create_agent(f'Rebel{i}') for i in range(10)]
+        for knight in knights:
+            em.create_relation(knight.name, king.name, 0.5)
+        for rebel in rebels:
+            em.create_relation(rebel.name, king.name, -0.8)
+        goal = em.create_goal_for_agent(king.name, 'battle won', 1.0, True)
+        goal.likelihood = 0.5
+
+        graph = em.relation_graph.update(em.agents)
+        self.assertEqual(graph.in_edges(king.name), (0, 50))
+        self.assertEqual(graph.in_edges(rebels[0].name), (50, 50))
+
+        em.appraise_belief(1.0, knights[0].name, [goal.name], [1.0])
+        for knight in knights:
+            self.assert_emotion(knight, 'happy-for', 0.25)
+            self.assert_relation(knight, 'happy-for', 0.25)
+        for rebel in rebels:
+            self.assert_emotion(rebel, 'resentment', 0.4)
+        self.assert_emotion(knights[0], 'gratification', 0.25)
+        self.assert_emotion(knights[1], 'gratification', 0, False)
+        self.assert_emotion(king, 'gratitude', 0.5)
+
+        # a rebel changes sides, the graph follows the relation update
+        em.create_relation(rebels[0].name, king.name, 0.6)
+        em.appraise_belief(1.0, None, [goal.name], [-1.0])
+        self.assert_emotion(rebels[0], 'pity', 0.6)
+        self.assert_emotion(rebels[1], 'gloating', 0.8)
+
+    '''
+    Test 8 : test what-if appraisal in a fork.
+    '''
+    def test_8_rpg_what_if(self):
+        print("\nTEST 8: The thief wonders how the village would feel if he stole the blacksmith's hammer.")
+
+        em = Gamygdala()
+        blacksmith = em.create_agent('Blacksmith')
+        villager = em.create_agent('Villager')
+        thief = em.create_agent('Thief')
+        em.create_relation(villager.name, blacksmith.name, 0.8)
+        em.create_relation(thief.name, blacksmith.name, -0.5)
+        goal = em.create_goal_for_agent(blacksmith.name, 'keep hammer', 0.9, True)
+        em.appraise_belief(0.6, None, [goal.name], [1.0])
+        state = lambda agent: ([(e.name, e.intensity) for e in agent.internal_state],
+                               [(r.agent_name, r.like, [(e.name, e.intensity) for e in r.emotion_list]) for r in agent.current_relations])
+        before = [state(agent) for agent in em.agents]
+
+        what_if = em.fork()
+        what_if.appraise_belief(1.0, thief.name, [goal.name], [-1.0])
+
+        # the fork feels it...
+        emotions = what_if.emotion_deltas()
+        self.assertGreater(emotions[blacksmith.name]['distress'], 0.7)
+        self.assertGreater(emotions[blacksmith.name]['anger'], 0.7)
+        self.assertGreater(emotions[villager.name]['pity'], 0.5)
+        self.assertGreater(emotions[thief.name]['gloating'], 0.3)
+        pad = what_if.pad_deltas()
+        self.assertLess(pad[blacksmith.name][0], 0)
+        self.assertGreater(pad[thief.name][1], 0)
+        self.assertEqual(what_if.goal_deltas(), {goal.name: (0.8, 0.0)})
+        self.assertIsNotNone(what_if.get_agent_by_name(blacksmith.name).get_relation(thief.name))
+
+        # ...the world does not
+        self.assertEqual(goal.likelihood, 0.8)
+        self.assertEqual([state(agent) for agent in em.agents], before)
+        self.assertIsNone(blacksmith.get_relation(thief.name))
+
+        # new relations and decay stay in the fork too
+        what_if.create_relation(villager.name, thief.name, -0.9)
+        what_if.appraise_belief(1.0, thief.name, [goal.name], [1.0])
+        self.assertEqual([e.name for e in what_if.get_agent_by_name(villager.name).get_relation(thief.name).emotion_list], ['resentment'])
+        what_if.decay_all(1000)
+        self.assertLess(what_if.emotion_deltas()[blacksmith.name]['hope'], 0)
+        self.assertFalse(villager.has_relation_with(thief.name))
+        self.assertEqual([state(agent) for agent in em.agents], before)
+
+        # agents created in the fork take part in its appraisals, and only exist there
+        guard = what_if.create_agent('Guard')
+        what_if.create_relation(guard.name, blacksmith.name, 0.7)
+        what_if.appraise_belief(1.0, None, [goal.name], [-1.0])
+        self.assertIn('pity', what_if.emotion_deltas()[guard.name])
+        self.assertIn(guard.name, what_if.pad_deltas())
+        self.assertIsNone(em.get_agent_by_name(guard.name))
+        self.assertEqual([state(agent) for agent in em.agents], before)
+
+        # each fork starts from the world
+        other = em.fork()
+        other.appraise_belief(1.0, villager.name, [goal.name], [1.0])
+        self.assertIn('gratitude', other.emotion_deltas()[blacksmith.name])
+        self.assertNotIn('distress', other.emotion_deltas()[blacksmith.name])
+
+        # the configuration is copied on write too: emotions and rules added to a fork stay in the fork
+        actions = list(em.rules.actions)
+        proud = em.fork()
+        proud.register_emotion('pride', [0.4, 0.3, 0.3])
+        proud.rules.add_action_rule('pride', SELF_SELF, POSITIVE)
+        proud.appraise_belief(1.0, blacksmith.name, [goal.name], [1.0])
+        self.assertIn('pride', proud.emotion_deltas()[blacksmith.name])
+        self.assertEqual(em.rules.actions, actions)
+        self.assertNotIn('pride', em.emotion_pad)
+        self.assertTrue(all('pride' not in agent.map_pad for agent in em.agents))
+
+    '''
+    Test 9 : test the bounded appraisal.
+    '''
+    def test_9_rpg_bounded(self):
+        print("\nTEST 9: The dragon burns the village, the news spreads over several frames.")
+
+        def world(budget_ms=None, priority=None):
+            em = Gamygdala()
+            em.last_millis = 0
+            for name in ('Chief', 'Farmer', 'Hunter', 'Dragon'):
+                em.create_agent(name)
+            goal = em.create_goal_for_agent('Chief', 'village safe', 1.0, True)
+            em.get_agent_by_name('Farmer').add_goal(goal)
+            em.create_relation('Farmer', 'Chief', 0.9)
+            em.create_relation('Hunter', 'Chief', 0.4)
+            em.create_relation('Dragon', 'Chief', -1.0)
+            em.create_relation('Hunter', 'Farmer', 0.7)
+            em.set_budget(budget_ms, priority)
+            em.appraise_belief(0.5, None, ['village safe'], [1.0])
+            em.appraise_belief(1.0, 'Dragon', ['village safe'], [-1.0])
+            return em
+
+        emotions = lambda emotion_list: sorted((e.name, round(e.intensity, 9)) for e in emotion_list)
+        state = lambda em: [(emotions(agent.internal_state), sorted((r.agent_name, emotions(r.emotion_list)) for r in agent.current_relations))
+                            for agent in em.agents]
+        unbounded = world()
+        unbounded.decay_all(500)
+
+        # no time at all: the goal is updated, the emotions are pending
+        em = world(0)
+        self.assertEqual(em.get_goal_by_name('village safe').likelihood, 0.0)
+        self.assertTrue(all(agent.internal_state == [] for agent in em.agents))
+        self.assertFalse(em.is_settled())
+
+        # the decay that happens meanwhile is replayed on the pending work
+        em.decay_all(500)
+        self.assertTrue(em.process_pending())
+        self.assertTrue(em.is_settled())
+        self.assertEqual(state(em), state(unbounded))
+
+        # the work is ordered by priority, e.g. the farmer who is near the player first
+        em = world(0, lambda agent, intensity: 10 if agent.name == 'Farmer' else intensity)
+        self.assertEqual(em.work_queue.heap[0][3].name, 'Farmer')
+        em.set_budget(None)
+        self.assertTrue(em.is_settled())
+
+        # several decays between frames, with pruning: the agents the pending work may reach catch up with the decays they missed
+        def random_world(seed, decay_function, budget_ms=None):
+            rng = random.Random(seed)
+            em = generate_world(12, goals_per_agent=2, density=0.3, seed=seed)
+            em.last_millis = 0
+            em.set_decay(0.6, getattr(em, decay_function))
+            em.set_budget(budget_ms)
+            for _ in range(6):
+                goal = rng.choice(em.goals)
+                causal_agent = rng.choice(em.agents + [None])
+                em.appraise_belief(rng.random(), causal_agent and causal_agent.name, [goal.name], [rng.choice((-1, 1)) * rng.random()])
+                for _ in range(3):
+                    em.decay_all(rng.randint(100, 1000))
+                    em.process_pending(rng.choice((0, 0.01)))
+            em.process_pending()
+            em.decay_all(500)
+            return em
+
+        for seed in range(8):
+            for decay_function in ('exponential_decay', 'linear_decay'):
+                em = random_world(seed, decay_function, 0)
+                self.assertTrue(em.is_settled())
+                self.assertEqual(state(em), state(random_world(seed, decay_function)))
+
+    '''
+    Test 10 : test the decay profiles.
+    '''
+    def test_10_rpg_decay_profiles(self):
+        print("\nTEST 10: The ogre chief holds a grudge, the villagers forget fast.")
+
+        em = Gamygdala()
+        em.last_millis = 0
+        em.set_decay(0.5, em.exponential_decay)
+        em.set_decay_profile(0.9, em.exponential_decay, emotion_name='anger')
+        em.set_decay_profile(0.8, em.exponential_decay, archetype='boss')
+        em.set_decay_profile(0.1, em.linear_decay, emotion_name='distress', archetype='boss')
+        chief = em.create_agent('Ogre chief', 'boss')
+        villager = em.create_agent('Villager', 'villager')
+        em.create_agent('Knight')
+        for agent in (chief, villager):
+            em.create_goal_for_agent(agent.name, f'{agent.name} home safe', 1.0, True)
+            em.create_relation(agent.name, 'Knight', 0.0)
+            agent.get_goal_by_name(f'{agent.name} home safe').likelihood = 1.0
+            em.appraise_belief(1.0, 'Knight', [f'{agent.name} home safe'], [-1.0])
+
+        before = {agent.name: {e.name: e.intensity for e in agent.internal_state} for agent in (chief, villager)}
+        em.decay_all(2000)
+        after = {agent.name: {e.name: e.intensity for e in agent.internal_state} for agent in (chief, villager)}
+
+        # villagers: anger lingers more than the rest
+        self.assertAlmostEqual(after['Villager']['anger'], before['Villager']['anger'] * 0.81)
+        self.assertAlmostEqual(after['Villager']['distress'], before['Villager']['distress'] * 0.25)
+        # bosses: their own profile, linear for distress
+        self.assertAlmostEqual(after['Ogre chief']['anger'], before['Ogre chief']['anger'] * 0.64)
+        self.assertAlmostEqual(after['Ogre chief']['distress'], before['Ogre chief']['distress'] - 2.0 * 0.1)
+        # the emotions felt for relations decay like the internal ones
+        anger = {e.name: e.intensity for e in villager.get_relation('Knight').emotion_list}['anger']
+        self.assertAlmostEqual(anger, after['Villager']['anger'])
+
+        # the profiles are computed once per decay step
+        self.assertEqual(len(em.decay_cache), 2)
+        em.set_decay_profile(None, emotion_name='anger')
+        em.decay_all(1000)
+        self.assertAlmostEqual({e.name: e.intensity for e in villager.internal_state}['anger'], after['Villager']['anger'] * 0.5)
+
+if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,176 @@
+from array import array
+
+PAD_CHANNELS = ('pleasure', 'arousal', 'dominance')
+
+'''
+Class EmotionHistory
+Bounded time series of an agent's emotion intensities and PAD state, see Gamygdala.enable_history.
+Samples are stored in fixed-capacity ring buffers (array-backed, one row of floats per sample).
+When the finest buffer is full, its oldest samples are averaged by groups of factor into the next, coarser buffer, and so on;
+the oldest samples of the coarsest buffer are dropped. Evicted samples waiting for their group to be complete are reported as one partial
+average, so that queries never miss a time range. Memory is thus bounded to levels * capacity * (channels + 1) floats per agent,
+for a history that covers about capacity * interval * (1 + factor + factor^2 + ...) milliseconds.
+Params:
+* emotion_names: The emotions to record (the PAD channels are always recorded).
+* capacity: The number of samples per buffer.
+* interval_ms: The minimum time between two samples in milliseconds.
+* levels: The number of buffers, each one factor times coarser than the previous one.
+* factor: The number of samples averaged into one sample of the next buffer.
+'''
+class EmotionHistory:
+    def __init__(self, emotion_names, capacity=256, interval_ms=100, levels=3, factor=4):
+        self.channels = tuple(emotion_names) + PAD_CHANNELS
+        self.channel_index = {name: i for i, name in enumerate(self.channels)}
+        self.capacity = capacity
+        self.interval_ms = interval_ms
+        self.factor = factor
+        self.levels = [_Level(capacity, len(self.channels)) for _ in range(levels)]
+        self.last_sample = None
+
+    '''
+    method sample
+    Records the current state of the agent, if interval_ms has passed since the last sample.
+    Params:
+    * agent: The agent to sample.
+    * time_ms: The current time in milliseconds.
+    return {bool}: True if a sample was recorded.
+    '''
+    def sample(self, agent, time_ms):
+        if self.last_sample is not None and time_ms - self.last_sample < self.interval_ms:
+            return False
+        self.last_sample = time_ms
+
+        row = [0.0] * len(self.channels)
+        for emotion in agent.internal_state:
+            i = self.channel_index.get(emotion.name)
+            if i is not None:
+                row[i] = emotion.intensity
+        row[-3:] = agent.get_pad_state(False)
+        self._push(0, time_ms, row)
+        return True
+
+    def _push(self, level, time_ms, row):
+        current = self.levels[level]
+        evicted = current.push(time_ms, row)
+        if evicted is not None and level + 1 < len(self.levels):
+            # downsample: average factor evicted samples into one sample of the next level
+            if current.accumulate(evicted[0], evicted[1]) == self.factor:
+                self._push(level + 1, *current.take_average())
+
+    '''
+    method series
+    Returns the samples of one channel, oldest first.
+    Params:
+    * channel: An emotion name or 'pleasure', 'arousal', 'dominance'.
+    * seconds: Only return the samples of the last seconds (None for the whole history).
+    * now: The reference time in milliseconds for seconds (the last sample by default).
+    return {tuple}: (times in milliseconds, values), as two lists.
+    '''
+    def series(self, channel, seconds=None, now=None):
+        c = self.channel_index[channel]
+        since = None
+        if seconds is not None:
+            if now is None:
+                now = self.last_sample if self.last_sample is not None else 0
+            since = now - seconds * 1000
+        times = []
+        values = []
+        for time_ms, row in self._rows():
+            if since is None or time_ms >= since:
+                times.append(time_ms)
+                values.append(row[c])
+        return times, values
+
+    '''
+    method export
+    Bulk export of the whole history, oldest first.
+    return {tuple}: (times, rows) where times is an array of n floats and rows an array of n * len(channels) floats (row major).
+    '''
+    def export(self):
+        times = array('d')
+        rows = array('d')
+        for time_ms, row in self._rows():
+            times.append(time_ms)
+            rows.extend(row)
+        return times, rows
+
+    '''
+    method to_numpy
+    Bulk export of the whole history as NumPy arrays (requires numpy).
+    return {tuple}: (times, values) with times of shape (n,) and values of shape (n, len(channels)), see the channels attribute for the column order.
+    '''
+    def to_numpy(self):
+        import numpy
+        times, rows = self.export()
+        return numpy.frombuffer(times, dtype=numpy.float64).copy(), numpy.frombuffer(rows, dtype=numpy.float64).reshape(-1, len(self.channels)).copy()
+
+    def _rows(self):
+        # Oldest first: each buffer is older than the samples waiting in the accumulator of the next finer buffer
+        for level in reversed(self.levels):
+            partial = level.partial_average()
+            if partial is not None:
+                yield partial
+            yield from level.rows()
+
+    def __len__(self):
+        return sum(level.count + (level.acc_count > 0) for level in self.levels)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+class _Level:
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.width = width
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity * width))
+        self.start = 0
+        self.count = 0
+        self.acc_time = 0.0
+        self.acc_values = [0.0] * width
+        self.acc_count = 0
+
+    def push(self, time_ms, row):
+        # Appends a sample, returns the evicted (time, row) if the buffer was full
+        evicted = None
+        if self.count == self.capacity:
+            evicted = self.slot(self.start)
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.count += 1
+        slot = (self.start + self.count - 1) % self.capacity
+        self.times[slot] = time_ms
+        self.values[slot * self.width:(slot + 1) * self.width] = array('d', row)
+        return evicted
+
+    def slot(self, slot):
+        return self.times[slot], self.values[slot * self.width:(slot + 1) * self.width]
+
+    def rows(self):
+        for i in range(self.count):
+            yield self.slot((self.start + i) % self.capacity)
+
+    def accumulate(self, time_ms, row):
+        self.acc_time += time_ms
+        for i in range(self.width):
+            self.acc_values[i] += row[i]
+        self.acc_count += 1
+        return self.acc_count
+
+    def partial_average(self):
+        n = self.acc_count
+        if n == 0:
+            return None
+        return self.acc_time / n, [value / n for value in self.acc_values]
+
+    def take_average(self):
+        average = self.partial_average()
+        self.acc_time = 0.0
+        self.acc_values = [0.0] * self.width
+        self.acc_count = 0
+        return average
+
+    @property
+    def nbytes(self):
+        return self.times.itemsize * len(self.times) + self.values.itemsize * len(self.values) + 8 * self.width
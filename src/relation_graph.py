@@ -0,0 +1,180 @@
+from array import array
+from relation import Relation
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+'''
+Class RelationGraph
+Sparse adjacency structure of the relations between agents, used by Gamygdala for the social appraisal.
+The graph is stored in CSR form indexed by target agent: the relations towards agent i (its observers) are
+observers[indptr[i]:indptr[i + 1]], with the matching relations and like values.
+The social emotions of all observers of a goal owner can then be computed in one pass over the owner's in-edges,
+proportional to its in-degree instead of the number of agents (vectorized with numpy when available).
+The graph is rebuilt lazily when agents are registered. The relations created afterwards through Agent.update_relation
+(or Gamygdala.create_relation, or agent_actions) are kept in a side list by target (see added_in_edges), which is merged
+by the next rebuild once it grows over an eighth of the graph: the first belief on a goal shared by many owners creates
+one relation per owner towards the causal agent, which must not rebuild the graph once per owner.
+The like values are refreshed when a relation.like changes (see Relation.like_version).
+'''
+class RelationGraph:
+    # Below this in-degree, the pure Python loop is faster than going through numpy
+    VECTORIZE_MIN_DEGREE = 32
+    # The added relations are merged into the CSR arrays when there are more than max(MERGE_MIN_EDGES, relations / 8)
+    MERGE_MIN_EDGES = 64
+
+    def __init__(self):
+        self.dirty = True
+        self.agent_count = 0
+        self.agent_ids = {}
+        self.indptr = array('l', [0])
+        self.observers = []
+        self.relations = []
+        self.likes = array('d')
+        self.likes_array = None
+        self.like_version = -1
+        self.added_edges = {}
+        self.added_count = 0
+
+    def invalidate(self):
+        self.dirty = True
+
+    '''
+    method add_relation
+    Adds a new relation to the graph without rebuilding it (see added_in_edges).
+    Params:
+    * observer: The agent who has the relation.
+    * relation: The relation.
+    '''
+    def add_relation(self, observer, relation):
+        if self.dirty or relation.agent_name not in self.agent_ids:
+            # the next rebuild will find it (agents are registered before their relations count)
+            return
+        self.added_edges.setdefault(relation.agent_name, []).append((observer, relation))
+        self.added_count += 1
+        if self.added_count > max(self.MERGE_MIN_EDGES, len(self.relations) // 8):
+            self.invalidate()
+
+    '''
+    method update
+    Rebuilds the graph if it is out of date.
+    Params:
+    * agents: The list of agents, their position in the list is their ID in the graph.
+    return {RelationGraph}: self.
+    '''
+    def update(self, agents):
+        if self.dirty or self.agent_count != len(agents):
+            self.rebuild(agents)
+        elif self.like_version != Relation.like_version:
+            self.refresh_likes()
+        return self
+
+    def refresh_likes(self):
+        # in place, likes_array is a view of likes
+        likes = self.likes
+        for k, relation in enumerate(self.relations):
+            likes[k] = relation.like
+        self.like_version = Relation.like_version
+
+    def rebuild(self, agents):
+        agent_ids = {agent.name: i for i, agent in enumerate(agents)}
+        edges = [[] for _ in agents]
+        for observer in agents:
+            for relation in observer.current_relations:
+                target = agent_ids.get(relation.agent_name)
+                if target is not None:
+                    edges[target].append((observer, relation))
+
+        indptr = array('l', [0])
+        observers = []
+        relations = []
+        likes = array('d')
+        for in_edges in edges:
+            for observer, relation in in_edges:
+                observers.append(observer)
+                relations.append(relation)
+                likes.append(relation.like)
+            indptr.append(len(observers))
+
+        self.agent_ids = agent_ids
+        self.agent_count = len(agents)
+        self.indptr = indptr
+        self.observers = observers
+        self.relations = relations
+        self.likes = likes
+        self.likes_array = numpy.frombuffer(likes, dtype=numpy.float64) if numpy is not None and len(likes) else None
+        self.like_version = Relation.like_version
+        self.added_edges = {}
+        self.added_count = 0
+        self.dirty = False
+
+    '''
+    method in_edges
+    Params:
+    * agent_name: The target agent (e.g. the goal owner).
+    return {tuple}: (start, end) range of the relations towards the agent, (0, 0) if the agent is unknown.
+    '''
+    def in_edges(self, agent_name):
+        i = self.agent_ids.get(agent_name)
+        if i is None:
+            return 0, 0
+        return self.indptr[i], self.indptr[i + 1]
+
+    '''
+    method added_in_edges
+    Params:
+    * agent_name: The target agent (e.g. the goal owner).
+    return {list}: (observer, relation) pairs of the relations towards the agent added since the last rebuild, read along with in_edges.
+    '''
+    def added_in_edges(self, agent_name):
+        return self.added_edges.get(agent_name, ())
+
+    '''
+    method has_in_edges
+    Param:
+    * agent_name: The target agent.
+    return {bool}: Whether any agent has a relation with the agent.
+    '''
+    def has_in_edges(self, agent_name):
+        start, end = self.in_edges(agent_name)
+        return start != end or agent_name in self.added_edges
+
+    '''
+    method in_edge_observers
+    Param:
+    * agent_name: The target agent.
+    return {list}: The agents that have a relation with the agent.
+    '''
+    def in_edge_observers(self, agent_name):
+        start, end = self.in_edges(agent_name)
+        observers = self.observers
+        return [observers[k] for k in range(start, end)] + [observer for observer, _ in self.added_in_edges(agent_name)]
+
+    '''
+    method social_intensities
+    Computes |base * like| for the relations in [start, end), and culls the ones at or below min_intensity or with |like| below min_like.
+    Params:
+    * start, end: The range of relations (see in_edges).
+    * base: |utility * delta_likelihood| of the goal owner.
+    * min_like: The minimum |like| (see Gamygdala.set_precision).
+    * min_intensity: The minimum intensity (see Gamygdala.set_precision).
+    return {list}: (index, intensity) pairs for the kept relations, in graph order.
+    '''
+    def social_intensities(self, start, end, base, min_like=0.0, min_intensity=0.0):
+        if self.likes_array is not None and end - start >= self.VECTORIZE_MIN_DEGREE:
+            likes = numpy.abs(self.likes_array[start:end])
+            intensities = base * likes
+            kept = numpy.nonzero((likes >= min_like) & (intensities > min_intensity))[0]
+            return list(zip((kept + start).tolist(), intensities[kept].tolist()))
+
+        result = []
+        likes = self.likes
+        for k in range(start, end):
+            like = abs(likes[k])
+            if like >= min_like:
+                emotion_intensity = base * like
+                if emotion_intensity > min_intensity:
+                    result.append((k, emotion_intensity))
+        return result
@@ -0,0 +1,92 @@
+import unittest
+import random
+from gamygdala import Gamygdala
+from relation_graph import RelationGraph, numpy
+
+class TestRelationGraph(unittest.TestCase):
+
+    def appraise_after_like_change(self, debug):
+        em = Gamygdala()
+        em.create_agent('King')
+        fan = em.create_agent('Fan')
+        em.create_relation('Fan', 'King', 0.5)
+        em.create_goal_for_agent('King', 'crowned', 1.0)
+        em.relation_graph.update(em.agents)
+
+        # the like changes after the graph is built
+        fan.get_relation('King').like = -0.9
+        em.debug = debug
+        em.appraise_belief(1.0, None, ['crowned'], [1.0])
+        return {emotion.name: emotion.intensity for emotion in fan.internal_state}
+
+    def test_like_change(self):
+        emotions = self.appraise_after_like_change(False)
+        self.assertEqual(emotions, self.appraise_after_like_change(True))
+        self.assertAlmostEqual(emotions['resentment'], 0.9)
+        self.assertNotIn('happy-for', emotions)
+
+    def appraise_with_new_relations(self, rebuild_each_relation):
+        # a goal shared by many owners, caused by an agent none of them has a relation with
+        em = Gamygdala()
+        rng = random.Random(3)
+        for i in range(60):
+            em.create_agent(f'npc{i}')
+        for agent in em.agents:
+            for target in rng.sample(em.agents, 5):
+                if target is not agent:
+                    agent.update_relation(target.name, rng.uniform(-1, 1))
+        stranger = em.create_agent('Stranger')
+        goal = em.create_goal_for_agent('npc0', 'harvest', 1.0, True)
+        for agent in em.agents[1:30]:
+            agent.add_goal(goal)
+        em.create_goal_for_agent('Stranger', 'welcome', 1.0, True)
+
+        graph = em.relation_graph.update(em.agents)
+        if rebuild_each_relation:
+            graph.add_relation = lambda observer, relation: graph.invalidate()
+        rebuilds = []
+        rebuild = graph.rebuild
+        graph.rebuild = lambda agents: rebuilds.append(len(agents)) or rebuild(agents)
+
+        em.appraise_belief(1.0, 'Stranger', ['harvest'], [1.0])
+        # the owners now have a relation with the stranger, which they feel for when it is welcome
+        for agent in em.agents[:30]:
+            agent.get_relation('Stranger').like = 0.8
+        em.appraise_belief(1.0, None, ['welcome'], [1.0])
+
+        state = [(agent.name, sorted((e.name, round(e.intensity, 9)) for e in agent.internal_state),
+                  sorted((r.agent_name, sorted((e.name, round(e.intensity, 9)) for e in r.emotion_list)) for r in agent.current_relations))
+                 for agent in em.agents]
+        return state, len(rebuilds)
+
+    def test_added_relations(self):
+        state, rebuilds = self.appraise_with_new_relations(False)
+        # the relations created by agent_actions are read from the side list, without rebuilding the graph
+        self.assertEqual(rebuilds, 0)
+        # same emotions as rebuilding the graph for each new relation
+        reference, rebuilds = self.appraise_with_new_relations(True)
+        self.assertEqual(rebuilds, 30)
+        self.assertEqual(state, reference)
+        self.assertTrue(any(r[0] == 'Stranger' and r[1] for _, _, relations in state for r in relations))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_vectorized_branch(self):
+        em = Gamygdala()
+        rng = random.Random(7)
+        king = em.create_agent('King')
+        for i in range(100):
+            em.create_agent(f'npc{i}')
+            em.create_relation(f'npc{i}', king.name, rng.uniform(-1, 1))
+        graph = em.relation_graph.update(em.agents)
+        start, end = graph.in_edges(king.name)
+        self.assertGreaterEqual(end - start, RelationGraph.VECTORIZE_MIN_DEGREE)
+
+        vectorized = graph.social_intensities(start, end, 0.6, 0.2, 0.05)
+        graph.VECTORIZE_MIN_DEGREE = end - start + 1
+        pure_python = graph.social_intensities(start, end, 0.6, 0.2, 0.05)
+        self.assertEqual([k for k, _ in vectorized], [k for k, _ in pure_python])
+        for (_, a), (_, b) in zip(vectorized, pure_python):
+            self.assertAlmostEqual(a, b)
+
+if __name__ == "__main__":
+    unittest.main()
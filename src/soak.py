@@ -0,0 +1,204 @@
+import argparse
+import random
+import time
+from gamygdala import Gamygdala
+
+'''
+Soak test harness
+Builds synthetic worlds from a few parameters and drives appraise_belief and decay_all on them for a given duration,
+reporting throughput, tick jitter, live emotion and relation counts and RSS growth over time.
+This is meant to find slow drifts (e.g. relations that keep being auto-created by agent actions, emotions that never decay)
+that a microbenchmark would not show.
+Usage:
+    python soak.py --agents 500 --goals 3 --shared 0.2 --density 0.02 --rate 2000 --duration 3600
+'''
+
+'''
+method generate_world
+Creates a Gamygdala instance with agents, goals and relations.
+Params:
+* agents: The number of agents.
+* goals_per_agent: The number of goals of each agent.
+* shared_fraction: The fraction of an agent's goals that are picked from the goals of other agents (common goals) instead of new ones.
+* density: The probability that an agent has a relation with another agent.
+* positive_fraction: The fraction of relations with a positive like.
+* seed: The random seed (None for a random world).
+return {Gamygdala}: The engine, with all agents, goals and relations registered.
+'''
+def generate_world(agents=100, goals_per_agent=3, shared_fraction=0.2, density=0.05, positive_fraction=0.7, seed=None):
+    rng = random.Random(seed)
+    em = Gamygdala()
+
+    for i in range(agents):
+        em.create_agent(f'agent{i}')
+
+    for agent in em.agents:
+        for _ in range(goals_per_agent):
+            if em.goals and rng.random() < shared_fraction:
+                # common goal, added directly to avoid the create_goal_for_agent warning
+                goal = rng.choice(em.goals)
+                if not agent.has_goal(goal.name):
+                    agent.add_goal(goal)
+            else:
+                goal = em.create_goal_for_agent(agent.name, f'goal{len(em.goals)}', rng.choice((-1, 1)) * rng.uniform(0.1, 1.0))
+                goal.is_maintenance_goal = True
+
+    if density > 0:
+        for source in em.agents:
+            for target in em.agents:
+                if source is not target and rng.random() < density:
+                    sign = 1 if rng.random() < positive_fraction else -1
+                    source.update_relation(target.name, sign * rng.uniform(0.1, 1.0))
+
+    return em
+
+def count_emotions(em):
+    emotions = 0
+    relation_emotions = 0
+    relations = 0
+    for agent in em.agents:
+        emotions += len(agent.internal_state)
+        relations += len(agent.current_relations)
+        for relation in agent.current_relations:
+            relation_emotions += len(relation.emotion_list)
+    return emotions, relation_emotions, relations
+
+def rss_kb():
+    # Current resident set size in kB, or the peak one where /proc is not available.
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return 0
+
+'''
+method soak
+Drives the engine for a duration: at every tick, fires the number of beliefs given by the rate and decays all agents.
+Params:
+* em: The Gamygdala instance (see generate_world).
+* duration: The duration of the test in seconds.
+* rate: The number of beliefs per second.
+* incremental_fraction: The fraction of incremental beliefs (the others are absolute).
+* causal_fraction: The fraction of beliefs caused by an agent (the others have no causal agent).
+* tick: The tick (decay) interval in seconds.
+* report_interval: The interval in seconds between two reports.
+* seed: The random seed of the belief stream.
+* out: Callable used to print reports (None to stay silent).
+return {list}: One report (dict) per report interval.
+'''
+def soak(em, duration=60, rate=1000, incremental_fraction=0.5, causal_fraction=0.5, tick=0.1, report_interval=5, seed=None, out=print):
+    rng = random.Random(seed)
+    goal_names = [goal.name for goal in em.goals]
+    agent_names = [agent.name for agent in em.agents]
+    reports = []
+
+    start = time.perf_counter()
+    em.last_millis = int(time.time() * 1000)
+    rss_start = rss_kb()
+    relations_start = count_emotions(em)[2]
+
+    next_tick = start
+    window_start = start
+    window_beliefs = 0
+    window_jitter = []
+    window_busy = 0.0
+    pending = 0.0
+    total_beliefs = 0
+
+    while True:
+        now = time.perf_counter()
+        if now - start >= duration:
+            break
+        if now < next_tick:
+            time.sleep(next_tick - now)
+            now = time.perf_counter()
+        window_jitter.append(now - next_tick)
+        next_tick += tick
+        if next_tick < now:
+            # we are late by more than one tick, do not try to catch up
+            next_tick = now + tick
+
+        # beliefs of this tick
+        pending += rate * tick
+        count = int(pending)
+        pending -= count
+        for _ in range(count):
+            causal = rng.choice(agent_names) if rng.random() < causal_fraction else None
+            em.appraise_belief(rng.random(), causal, [rng.choice(goal_names)], [rng.uniform(-1, 1)], rng.random() < incremental_fraction)
+        em.decay_all()
+
+        window_busy += time.perf_counter() - now
+        window_beliefs += count
+        total_beliefs += count
+
+        elapsed = time.perf_counter() - window_start
+        if elapsed >= report_interval:
+            reports.append(_report(em, time.perf_counter() - start, elapsed, window_beliefs, window_jitter, window_busy, rss_start, relations_start))
+            if out is not None:
+                out(format_report(reports[-1]))
+            window_start = time.perf_counter()
+            window_beliefs = 0
+            window_jitter = []
+            window_busy = 0.0
+
+    if window_beliefs:
+        reports.append(_report(em, time.perf_counter() - start, time.perf_counter() - window_start, window_beliefs, window_jitter, window_busy, rss_start, relations_start))
+        if out is not None:
+            out(format_report(reports[-1]))
+
+    if out is not None and reports:
+        out(f"Total: {total_beliefs} beliefs in {reports[-1]['time']:.1f}s, "
+            f"relations {relations_start} -> {reports[-1]['relations']}, RSS {rss_start} -> {reports[-1]['rss_kb']} kB")
+    return reports
+
+def _report(em, time_passed, elapsed, beliefs, jitter, busy, rss_start, relations_start):
+    emotions, relation_emotions, relations = count_emotions(em)
+    jitter = sorted(jitter) if jitter else [0.0]
+    rss = rss_kb()
+    return {
+        'time': time_passed,
+        'beliefs_per_second': beliefs / elapsed if elapsed > 0 else 0.0,
+        'load': busy / elapsed if elapsed > 0 else 0.0,
+        'jitter_mean_ms': 1000 * sum(jitter) / len(jitter),
+        'jitter_p99_ms': 1000 * jitter[min(len(jitter) - 1, int(0.99 * len(jitter)))],
+        'jitter_max_ms': 1000 * jitter[-1],
+        'emotions': emotions,
+        'relation_emotions': relation_emotions,
+        'relations': relations,
+        'relations_growth': relations - relations_start,
+        'rss_kb': rss,
+        'rss_growth_kb': rss - rss_start,
+    }
+
+def format_report(report):
+    return (f"[{report['time']:8.1f}s] {report['beliefs_per_second']:9.0f} beliefs/s, load {100 * report['load']:5.1f}%, "
+            f"jitter mean/p99/max {report['jitter_mean_ms']:.2f}/{report['jitter_p99_ms']:.2f}/{report['jitter_max_ms']:.2f} ms, "
+            f"emotions {report['emotions']} (+{report['relation_emotions']} in relations), "
+            f"relations {report['relations']} ({report['relations_growth']:+d}), RSS {report['rss_kb']} kB ({report['rss_growth_kb']:+d})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Gamygdala soak test')
+    parser.add_argument('--agents', type=int, default=100, help='number of agents')
+    parser.add_argument('--goals', type=int, default=3, help='goals per agent')
+    parser.add_argument('--shared', type=float, default=0.2, help='fraction of shared goals')
+    parser.add_argument('--density', type=float, default=0.05, help='relation graph density')
+    parser.add_argument('--positive', type=float, default=0.7, help='fraction of positive relations')
+    parser.add_argument('--rate', type=float, default=1000, help='beliefs per second')
+    parser.add_argument('--incremental', type=float, default=0.5, help='fraction of incremental beliefs')
+    parser.add_argument('--causal', type=float, default=0.5, help='fraction of beliefs with a causal agent')
+    parser.add_argument('--duration', type=float, default=60, help='duration in seconds')
+    parser.add_argument('--tick', type=float, default=0.1, help='decay interval in seconds')
+    parser.add_argument('--report', type=float, default=5, help='report interval in seconds')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    args = parser.parse_args()
+
+    world = generate_world(args.agents, args.goals, args.shared, args.density, args.positive, args.seed)
+    print(f"World: {len(world.agents)} agents, {len(world.goals)} goals, {count_emotions(world)[2]} relations")
+    soak(world, args.duration, args.rate, args.incremental, args.causal, args.tick, args.report, args.seed)
@@ -0,0 +1,27 @@
+import unittest
+from soak import generate_world, soak, count_emotions
+
+class TestSoak(unittest.TestCase):
+
+    def test_generate_world(self):
+        em = generate_world(agents=20, goals_per_agent=2, shared_fraction=0.0, density=1.0, positive_fraction=1.0, seed=1)
+        self.assertEqual(len(em.agents), 20)
+        self.assertEqual(len(em.goals), 40)
+        self.assertEqual(count_emotions(em), (0, 0, 20 * 19))
+        self.assertTrue(all(relation.like > 0 for agent in em.agents for relation in agent.current_relations))
+
+    def test_shared_goals(self):
+        em = generate_world(agents=20, goals_per_agent=2, shared_fraction=1.0, density=0.0, seed=1)
+        # only the very first goal is created, all the others are shared
+        self.assertEqual(len(em.goals), 1)
+        self.assertTrue(all(agent.has_goal(em.goals[0].name) for agent in em.agents))
+
+    def test_soak(self):
+        em = generate_world(agents=10, goals_per_agent=2, density=0.3, seed=1)
+        reports = soak(em, duration=0.5, rate=200, tick=0.05, report_interval=0.2, seed=1, out=None)
+        self.assertGreaterEqual(len(reports), 2)
+        self.assertGreater(sum(report['beliefs_per_second'] for report in reports), 0)
+        self.assertEqual(reports[-1]['relations'], count_emotions(em)[2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from gamygdala import Gamygdala
+from agent import Agent
+
+# Decay functions by name, as bound methods cannot be sent to the worker processes
+DECAY_FUNCTIONS = ('exponential', 'linear')
+
+# The emotions recorded by default (the ones of the PAD map)
+EMOTION_NAMES = tuple(Agent('').map_pad.keys())
+
+'''
+Class Scenario
+A scripted scenario to replay with different parameters, in simulated time (see sweep).
+Params:
+* agents: The agents' names.
+* goals: A list of (agent_name, goal_name, utility, is_maintenance_goal), a goal listed for several agents is a common goal.
+* relations: A list of (source_name, target_name, like).
+* beliefs: A list of (time_ms, likelihood, causal_agent_name, affected_goal_names, goal_congruences, is_incremental), see Gamygdala.appraise_belief.
+* duration_ms: The duration of the scenario in milliseconds.
+* tick_ms: The simulated decay (and sampling) interval in milliseconds.
+* use_gain: Whether the recorded emotions and PAD states are the gained ones.
+'''
+class Scenario:
+    def __init__(self, agents, goals, relations, beliefs, duration_ms, tick_ms=100, use_gain=True):
+        self.agents = list(agents)
+        self.goals = list(goals)
+        self.relations = list(relations)
+        self.beliefs = sorted(beliefs, key=lambda belief: belief[0])
+        self.duration_ms = duration_ms
+        self.tick_ms = tick_ms
+        self.use_gain = use_gain
+
+    '''
+    method build
+    Creates the Gamygdala instance of the scenario for one configuration.
+    Params:
+    * config: A dict of parameters:
+      * decay_factor, decay_function ('exponential' or 'linear'): see Gamygdala.set_decay.
+      * 'decay_factor:<emotion name>': the decay factor of one emotion, see Gamygdala.set_decay_profile.
+      * gain: see Gamygdala.set_gain.
+      * 'utility:<goal name>': overrides the utility of a goal.
+    return {Gamygdala}: The engine, ready to run.
+    '''
+    def build(self, config):
+        em = Gamygdala()
+        for name in self.agents:
+            em.create_agent(name)
+
+        for agent_name, goal_name, utility, is_maintenance_goal in self.goals:
+            utility = config.get(f'utility:{goal_name}', utility)
+            goal = em.get_goal_by_name(goal_name)
+            if goal is None:
+                em.create_goal_for_agent(agent_name, goal_name, utility, is_maintenance_goal)
+            else:
+                em.get_agent_by_name(agent_name).add_goal(goal)
+
+        for source_name, target_name, like in self.relations:
+            em.create_relation(source_name, target_name, like)
+
+        decay_function = config.get('decay_function', 'exponential')
+        if decay_function not in DECAY_FUNCTIONS:
+            raise ValueError(f'Unknown decay function {decay_function}, choose between {DECAY_FUNCTIONS}')
+        decay_function = em.linear_decay if decay_function == 'linear' else em.exponential_decay
+        em.set_decay(config.get('decay_factor', em.decay_factor), decay_function)
+        for name, value in config.items():
+            if name.startswith('decay_factor:'):
+                em.set_decay_profile(value, decay_function, emotion_name=name[len('decay_factor:'):])
+        if 'gain' in config:
+            em.set_gain(config['gain'])
+        em.last_millis = 0
+        return em
+
+    '''
+    method run
+    Replays the scenario for one configuration.
+    return {tuple}: (emotions, pad), emotions[agent][tick][emotion] and pad[agent][tick][3], sampled at the end of every tick.
+    '''
+    def run(self, config):
+        em = self.build(config)
+        agents = [em.get_agent_by_name(name) for name in self.agents]
+        emotions = [[] for _ in agents]
+        pad = [[] for _ in agents]
+        emotion_index = {name: i for i, name in enumerate(EMOTION_NAMES)}
+
+        next_belief = 0
+        for tick in range(self.ticks()):
+            end = (tick + 1) * self.tick_ms
+            while next_belief < len(self.beliefs) and self.beliefs[next_belief][0] < end:
+                em.appraise_belief(*self.beliefs[next_belief][1:])
+                next_belief += 1
+            em.decay_all(self.tick_ms)
+
+            for i, agent in enumerate(agents):
+                row = [0.0] * len(EMOTION_NAMES)
+                for emotion in agent.get_emotional_state(self.use_gain):
+                    j = emotion_index.get(emotion.name)
+                    if j is not None:
+                        row[j] = emotion.intensity
+                emotions[i].append(row)
+                pad[i].append(agent.get_pad_state(self.use_gain))
+        return emotions, pad
+
+    def ticks(self):
+        return -(-self.duration_ms // self.tick_ms)
+
+    def times(self):
+        return [(tick + 1) * self.tick_ms for tick in range(self.ticks())]
+
+'''
+method expand_grid
+Params:
+* grid: A dict of parameter name -> list of values.
+return {list}: All configurations (dicts) of the grid.
+'''
+def expand_grid(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+'''
+Class SweepResult
+The trajectories and summaries of a sweep, indexed by configuration, agent, time and emotion (see EMOTION_NAMES), or PAD dimension.
+* emotions[c][a][t][e], pad[c][a][t][d]: The trajectories.
+* peak[c][a][e], mean[c][a][e]: The peak and mean intensity of each emotion over the scenario.
+* pad_mean[c][a][d], pad_final[c][a][d]: The mean and final PAD state.
+'''
+class SweepResult:
+    def __init__(self, scenario, configs, runs):
+        self.configs = configs
+        self.agents = list(scenario.agents)
+        self.emotion_names = EMOTION_NAMES
+        self.times = scenario.times()
+        self.emotions = [run[0] for run in runs]
+        self.pad = [run[1] for run in runs]
+
+        n = len(self.times)
+        self.peak = [[[max(column) for column in zip(*rows)] for rows in config] for config in self.emotions]
+        self.mean = [[[sum(column) / n for column in zip(*rows)] for rows in config] for config in self.emotions]
+        self.pad_mean = [[[sum(column) / n for column in zip(*rows)] for rows in config] for config in self.pad]
+        self.pad_final = [[rows[-1] for rows in config] for config in self.pad]
+
+    '''
+    method to_numpy
+    return {dict}: The trajectories and summaries as NumPy arrays (requires numpy), e.g. emotions of shape (configs, agents, times, emotions).
+    '''
+    def to_numpy(self):
+        import numpy
+        return {name: numpy.asarray(getattr(self, name), dtype=numpy.float64)
+                for name in ('times', 'emotions', 'pad', 'peak', 'mean', 'pad_mean', 'pad_final')}
+
+    '''
+    method best
+    Params:
+    * score: A callable(result, config_index) returning a number.
+    return {tuple}: (config, score) of the configuration with the highest score.
+    '''
+    def best(self, score):
+        scores = [score(self, c) for c in range(len(self.configs))]
+        c = max(range(len(scores)), key=scores.__getitem__)
+        return self.configs[c], scores[c]
+
+def _run(job):
+    scenario, config = job
+    return scenario.run(config)
+
+'''
+method sweep
+Runs a scenario for every configuration of a parameter grid, in simulated time and in parallel.
+Params:
+* scenario: The Scenario.
+* grid: A dict of parameter name -> list of values (see Scenario.build for the parameters).
+* processes: The number of worker processes (None for one per CPU, 1 to run in this process).
+return {SweepResult}: The results, in the order of expand_grid(grid).
+'''
+def sweep(scenario, grid, processes=None):
+    configs = expand_grid(grid)
+    jobs = [(scenario, config) for config in configs]
+    if processes == 1:
+        runs = [_run(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            runs = list(executor.map(_run, jobs, chunksize=max(1, len(jobs) // (4 * (processes or os.cpu_count() or 1)))))
+    return SweepResult(scenario, configs, runs)
@@ -0,0 +1,58 @@
+import unittest
+from sweep import Scenario, expand_grid, sweep, EMOTION_NAMES
+
+class TestSweep(unittest.TestCase):
+
+    def scenario(self):
+        # The dragon threatens the village, the knight saves it
+        return Scenario(
+            agents=['Villager', 'Knight'],
+            goals=[('Villager', 'village destroyed', -0.9, True), ('Knight', 'village destroyed', -0.5, True)],
+            relations=[('Knight', 'Villager', 0.8)],
+            beliefs=[(0, 0.6, None, ['village destroyed'], [1.0], False),
+                     (1000, 1.0, 'Knight', ['village destroyed'], [-1.0], False)],
+            duration_ms=3000, tick_ms=100)
+
+    def test_expand_grid(self):
+        configs = expand_grid({'decay_factor': [0.5, 0.9], 'gain': [1, 5, 10]})
+        self.assertEqual(len(configs), 6)
+        self.assertEqual(configs[0], {'decay_factor': 0.5, 'gain': 1})
+        self.assertEqual(configs[-1], {'decay_factor': 0.9, 'gain': 10})
+
+    def test_sweep(self):
+        scenario = self.scenario()
+        grid = {'decay_factor': [0.2, 0.9], 'decay_function': ['exponential'], 'utility:village destroyed': [-0.9, -0.3]}
+        result = sweep(scenario, grid, processes=1)
+        self.assertEqual(len(result.configs), 4)
+        self.assertEqual(len(result.times), 30)
+        self.assertEqual(len(result.emotions[0][0][0]), len(EMOTION_NAMES))
+
+        fear = EMOTION_NAMES.index('fear')
+        relief = EMOTION_NAMES.index('relief')
+        villager = result.agents.index('Villager')
+        # fear is felt right away, relief after the knight's action
+        self.assertGreater(result.emotions[0][villager][0][fear], 0)
+        self.assertEqual(result.emotions[0][villager][0][relief], 0)
+        self.assertGreater(result.emotions[0][villager][10][relief], 0)
+        # slower decay, more fear over time; higher utility, more fear
+        self.assertGreater(result.mean[2][villager][fear], result.mean[0][villager][fear])
+        self.assertGreater(result.peak[0][villager][fear], result.peak[1][villager][fear])
+        self.assertLess(result.pad_final[2][villager][0], 0.5)
+
+        config, _ = result.best(lambda r, c: r.mean[c][villager][relief])
+        self.assertEqual(config['decay_factor'], 0.9)
+
+        # the process pool gives the same results
+        self.assertEqual(sweep(scenario, grid, processes=2).emotions, result.emotions)
+
+    def test_emotion_decay(self):
+        result = sweep(self.scenario(), {'decay_factor': [0.5], 'decay_factor:fear': [0.5, 0.95]}, processes=1)
+        fear = EMOTION_NAMES.index('fear')
+        relief = EMOTION_NAMES.index('relief')
+        villager = result.agents.index('Villager')
+        # only fear lingers
+        self.assertGreater(result.mean[1][villager][fear], result.mean[0][villager][fear])
+        self.assertAlmostEqual(result.mean[1][villager][relief], result.mean[0][villager][relief])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import heapq
+import itertools
+import time
+
+'''
+Class WorkQueue
+Prioritized queue of appraisal work, used by Gamygdala in bounded mode (see Gamygdala.set_budget).
+Instead of updating all emotional states at once, appraise_all updates the goal likelihoods and queues one task per goal owner
+(and per agent with observers, see appraise_all), with priority |utility * delta_likelihood|.
+Processing a task runs the owner's internal emotions, agent actions and social propagation, but the resulting emotions are queued again,
+each one with its own priority (its intensity, e.g. |utility * delta_likelihood * like| for the social emotions), instead of being added.
+Processing an emotion adds it to the agent (and the relation).
+The queue is processed by epoch (the number of decays before the appraisal), then in priority order, until the time budget is spent,
+the rest is left for the next calls.
+Completion: once the queue is empty, the emotional states are the ones of the unbounded appraisal, provided that relations and goal owners
+are not changed while work is pending (tasks use the relations they find when they are processed). For that, decay_all does not decay
+the agents that pending work may still reach (see decay): they are held at their epoch, and their decays are replayed, in order,
+once the work of the previous epochs is done, so that each decay and pruning applies to the same sums as in the unbounded appraisal.
+Params:
+* gamygdala_instance: The Gamygdala instance.
+* budget_ms: The time budget of each appraisal in milliseconds.
+* priority: An optional callable(agent, intensity) returning the priority of the work for an agent (higher first), e.g. to favour the agents
+  close to the player. By default the priority is the intensity.
+'''
+class WorkQueue:
+    def __init__(self, gamygdala_instance, budget_ms, priority=None):
+        self.gamygdala_instance = gamygdala_instance
+        self.budget_ms = budget_ms
+        self.priority = priority
+        self.heap = []
+        self.counter = itertools.count()
+        self.decays = []            # millis_passed of the decays since the queue was last empty
+        self.epoch = 0              # epoch of the task being processed
+        self.held = {}              # agent -> number of decays applied to it, for the agents decay_all did not decay
+        self.targets = {}           # agent -> number of queued emotions for it
+        self.task_owners = {}       # agent -> number of queued tasks for it
+        self.task_causes = {}       # causal agent name -> number of queued tasks
+        self.processed = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    '''
+    method push_owner
+    Queues the appraisal of a goal change for an agent (see Gamygdala.appraise_all).
+    Params:
+    * owner: The agent.
+    * causal_agent_name, utility, desirability, delta_likelihood: The goal change.
+    * goal_likelihood: The goal likelihood after the change.
+    * owns_goal: Whether the agent owns the goal (otherwise only its observers are appraised).
+    '''
+    def push_owner(self, owner, causal_agent_name, utility, desirability, delta_likelihood, goal_likelihood, owns_goal):
+        em = self.gamygdala_instance
+        if not owns_goal:
+            if not em.relation_graph.update(em.agents).has_in_edges(owner.name):
+                return
+        base = abs(utility * delta_likelihood)
+        priority = base if self.priority is None else self.priority(owner, base)
+        task = (causal_agent_name, utility, desirability, delta_likelihood, goal_likelihood, owns_goal)
+        heapq.heappush(self.heap, (len(self.decays), -priority, next(self.counter), owner, None, None, task))
+        _count(self.task_owners, owner, 1)
+        _count(self.task_causes, causal_agent_name, 1)
+
+    '''
+    method add
+    Queues an emotion (called by the Gamygdala appraisal methods while a task is processed).
+    Params:
+    * agent: The agent who feels the emotion.
+    * relation: The relation the emotion is about, or None.
+    * emotion_name, intensity: The emotion.
+    '''
+    def add(self, agent, relation, emotion_name, intensity):
+        priority = intensity if self.priority is None else self.priority(agent, intensity)
+        heapq.heappush(self.heap, (self.epoch, -priority, next(self.counter), agent, relation, emotion_name, intensity))
+        _count(self.targets, agent, 1)
+
+    '''
+    method decay
+    Starts a new epoch, called by Gamygdala.decay_all before it decays the agents.
+    The agents that the pending work may still reach (the agents with queued emotions, the owners and causal agents of queued tasks,
+    and the observers of these owners) are held: they are not decayed now, their decays are replayed when their work is done.
+    The held agents that pending work cannot reach anymore catch up with the previous decays, and are decayed now.
+    Param:
+    * millis_passed: The time of the decay.
+    return {dict}: The held agents (not to be decayed now), None if no work is pending.
+    '''
+    def decay(self, millis_passed):
+        if not self.heap:
+            return None
+        epoch = len(self.decays)
+        self.decays.append(millis_passed)
+
+        reachable = self._reachable_agents()
+        for agent in [agent for agent in self.held if agent not in reachable]:
+            self._catch_up(agent, epoch)
+            del self.held[agent]
+        for agent in reachable:
+            self.held.setdefault(agent, epoch)
+        return self.held
+
+    def _reachable_agents(self):
+        em = self.gamygdala_instance
+        reachable = set(self.targets)
+        reachable.update(self.task_owners)
+        for name in self.task_causes:
+            agent = em.get_agent_by_name(name) if name else None
+            if agent is not None:
+                reachable.add(agent)
+        graph = em.relation_graph.update(em.agents)
+        for owner in self.task_owners:
+            reachable.update(graph.in_edge_observers(owner.name))
+        return reachable
+
+    def _catch_up(self, agent, epoch):
+        # Replays the decays [held epoch, epoch) on a held agent
+        em = self.gamygdala_instance
+        millis_passed = em.millis_passed
+        for millis in self.decays[self.held[agent]:epoch]:
+            em.millis_passed = millis
+            agent.decay(em)
+        em.millis_passed = millis_passed
+        self.held[agent] = epoch
+
+    '''
+    method process
+    Processes the queued work in order.
+    Params:
+    * budget_ms: The time budget in milliseconds, None to process everything.
+    return {int}: The number of work items processed.
+    '''
+    def process(self, budget_ms=None):
+        deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+        heap = self.heap
+        held = self.held
+        processed = 0
+        while heap and (deadline is None or time.perf_counter() < deadline):
+            epoch, _, _, agent, relation, emotion_name, work = heapq.heappop(heap)
+            if emotion_name is None:
+                _count(self.task_owners, agent, -1)
+                _count(self.task_causes, work[0], -1)
+                self._process_task(agent, work, epoch)
+            else:
+                _count(self.targets, agent, -1)
+                if held and held.get(agent, epoch) < epoch:
+                    # the work of the previous epochs is done, the agent gets the decays it missed before this emotion
+                    self._catch_up(agent, epoch)
+                if relation is not None:
+                    relation.add_intensity(emotion_name, work)
+                agent.add_intensity(emotion_name, work)
+            processed += 1
+
+        if not heap:
+            for agent in held:
+                self._catch_up(agent, len(self.decays))
+            self.held = {}
+            self.decays = []
+        self.processed += processed
+        return processed
+
+    def _process_task(self, owner, task, epoch):
+        em = self.gamygdala_instance
+        causal_agent_name, utility, desirability, delta_likelihood, goal_likelihood, owns_goal = task
+        em.work_sink = self
+        self.epoch = epoch
+        try:
+            if owns_goal:
+                em.evaluate_internal_emotion(utility, delta_likelihood, goal_likelihood, owner)
+                em.agent_actions(owner.name, causal_agent_name, owner.name, desirability, utility, delta_likelihood)
+            em.propagate_social(owner, causal_agent_name, utility, desirability, delta_likelihood)
+        finally:
+            em.work_sink = None
+
+def _count(counts, key, n):
+    count = counts.get(key, 0) + n
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]